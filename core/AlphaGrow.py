@@ -17,14 +17,51 @@
         $Grow-State :: Abstraction
             bit field (int) made for model the grow data from a Grow object.
 
+        $Policy-Table :: Abstraction
+            bytes object of 256 elements. The element i is 0x01 when a pixel
+            with the [$Grow-State] i must be opaque after a grow step, and 0x00
+            otherwise. It can be used with bytes.translate.
+
+            A table given by the user (see Grow.grow_with_custom_policy) is read
+            as a grow policy: it's only looked up for the transparent pixels
+            with an opaque neighbor, and the index always has the search bit
+            (1 << 2) on. The opaque pixels stay opaque and the other ones stay
+            transparent, in every mode and engine. The tables used by the
+            translate mode (see Grow.policyTable) are indexed without that bit.
+
+        POLICY_TABLES :: dict
+            Cache of the [$Policy-Table] of each built-in grow policy.
+
+        OPAQUE_BIT    :: bytes
+            Translation table. Keeps only the Opaque bit of a [$Grow-State].
+
+        TO_STATE      :: bytes
+            Translation table. Maps alpha data into [$Grow-State] elements
+            without context (0x01 when opaque, 0x00 otherwise).
+
+        INDEX_CAPACITY :: int
+            Initial number of elements of the search index arrays of a Grow.
+
+        FRONTIER      :: bytes
+            [$Policy-Table] of the pixels that can be searched (the transparent
+            ones with at least one opaque neighbor).
+
     [*] Author
      |- Gaps : sGaps : ArtGaps
 """
+from .Shapes import decompose , dilate
+
 TYPES = { 1 : "B" ,
           2 : "H" ,
           4 : "I" ,
           8 : "L" }
 
+POLICY_TABLES  = {}
+INDEX_CAPACITY = 1 << 10
+OPAQUE_BIT    = bytes( s & 0x01 for s in range(256) )
+TO_STATE      = b"\x00" + b"\x01" * 255
+FRONTIER      = bytes( 0x01 if not s & 0x01 and s & 0xF0 else 0x00 for s in range(256) )
+
 class Grow( object ):
     """
         An Grow object is an automata. It takes the raw alpha data from a Node
@@ -60,6 +97,28 @@ class Grow( object ):
         Use unlift_data to get a clean bytearray that can be used outside
         these objects.
 
+        Translate mode:
+            When a Grow object is built with translate = True, each grow step
+            decides the whole frame at once. It computes the neighborhood
+            data of every pixel with shifts over the data (as a big integer)
+            and then maps each [$Grow-State] into its new opaque bit with
+            bytes.translate and a [$Policy-Table]. In this mode, the search
+            structures below are only built when they're required.
+
+        Buffers:
+            The data and the index arrays below are capacity buffers. The data
+            is only reallocated when a frame is bigger than every previous frame,
+            so a Grow object can be reused with frames of any size without
+            allocating it again. Only the first [size] elements of the data are
+            valid. The number of reallocations is kept in [allocations], and the
+            current capacity (in pixels) in [capacity].
+
+            The index arrays only hold the frontier, which is bounded by the
+            perimeter of the shapes instead of the area of the frame. They start
+            with INDEX_CAPACITY elements and they grow on demand: before each
+            loop that fills them, their capacity is checked against the maximum
+            number of elements that the loop can add. See memory().
+
         Relevant internal structures:
             __modified      :: memoryview( BYTE ) => holds the modified pixels after a __run_automata__ step.
             __preserved     :: memoryview( BYTE ) => holds the preserved pixels after a __run_automata__ step.
@@ -68,7 +127,7 @@ class Grow( object ):
         * Preserved elements are these considered as transparent after a __run_automata__ step.
         * Modified elements are these considered as opaques after a __run_automata__ step.
     """
-    def __init__( self , data , width , size , amount_of_items_on_search = None ):
+    def __init__( self , data , width , size , amount_of_items_on_search = None , translate = False ):
         """
             ARGUMENTS
                 data(bytearray):                alpha data.
@@ -76,11 +135,12 @@ class Grow( object ):
                 size(int):                      size or raw length of the alpha data.
                 amount_of_items_on_search(int): # of elements that will be cached in the search.
                                                 If it's none, then The amount will take a value automatically.
+                translate(bool):                enables the translate mode.
 
             Save shared information for futher method applications.
             """
 
-        self.data         = None    # User canvas data.
+        self.data         = None    # User canvas data. Capacity buffer: only the first [size] bytes are valid.
         self.size         = None    # Number of pixels.
         self.width        = None    # Width of each column.
 
@@ -88,20 +148,54 @@ class Grow( object ):
         self.__searchView = None    # [Integer]: Holds the elements to search in each __run_automata__ iteration.
         self.__modified   = None    # [Integer]: Holds the index of each modified element of the search.
         self.__preserved  = None    # [Ingeger]: Holds the index of each not-modified element of the search.
-        self.__indexSize  = None    # Int
+        self.__indexSize  = None    # Int: Bytes of each index.
+        self.__indexCap   = 0       # Int: Number of elements of each index array.
         self.__count      = None    # Int: Number of elements in the search
         self.__cmodif     = None    # Int: Number of elements modified.
         self.__cpresv     = None    # Int: Number of elements not-modified (preserved)
-        self.__staticsize = 0
+        self.__lifted     = False   # Bool: The search structures are valid.
+
+        # Buffer stats:
+        self.capacity     = 0       # Int: Number of pixels that the buffers can hold.
+        self.allocations  = 0       # Int: Number of times that the buffers were allocated.
+
+        # Objects used for the translate mode.
+        self.translate    = translate
+        self.__masks      = None    # Masks used to compute the neighborhood data. See __neighbor_masks__.
 
         self.setData( data , width , size , force_amount_of_items_on_search = amount_of_items_on_search )
 
     @classmethod
-    def singleton( cls , amount_of_items_on_search = None ):
+    def singleton( cls , amount_of_items_on_search = None , translate = False ):
         """ RETURNS
                 Trivial Grow object.
         """
-        return cls( bytearray() , 0 , 0 , amount_of_items_on_search )
+        return cls( bytearray() , 0 , 0 , amount_of_items_on_search , translate )
+
+    @staticmethod
+    def policyTable( grow_policy ):
+        """ ARGUMENTS
+                grow_policy( $Grow-State -> int or bool ): grow policy.
+            RETURNS
+                [$Policy-Table] equivalent to grow_policy.
+            Opaque pixels stay opaque, and the pixels without opaque neighbors
+            stay transparent, because __run_automata__ never searches them. """
+        SEARCHRQ = 1 << 2
+        return bytes( 0x01 if s & 0x01 else
+                      0x01 if s & 0xF0 and grow_policy( s | SEARCHRQ ) else
+                      0x00 for s in range(256) )
+
+    @staticmethod
+    def policyFunction( grow_policy ):
+        """ ARGUMENTS
+                grow_policy( ($Grow-State -> int or bool) or $Policy-Table ): grow policy.
+            RETURNS
+                function( $Grow-State ) -> int. Grow policy as function. """
+        if isinstance( grow_policy , (bytes , bytearray) ):
+            if len( grow_policy ) != 256:
+                raise TypeError( f"A Policy Table must have 256 elements, not {len(grow_policy)}" )
+            return grow_policy.__getitem__
+        return grow_policy
 
     @classmethod
     def __get_required_bytes_for__( cls , size ):
@@ -124,34 +218,15 @@ class Grow( object ):
                                                         (Useful when the previous data is as big as the current one).
             Smart constructor/Setter of a Grow object. """
 
-        # Builds new data:
-        self.data = bytearray( 0x01 if b else 0x00 for b in data )
-        self.width    = width
-        self.size     = size
-
-        self.__indexSize   = Grow.__get_required_bytes_for__( size )
-        required_size      = size * self.__indexSize
-
-        # Try to avoid new memoryview allocations each time this method is called:
+        # Try to avoid new allocations each time this method is called:
+        self.__reserve__( size )
         if force_amount_of_items_on_search:
-            # Recalculate values:
-            self.__indexSize = Grow.__get_required_bytes_for__( force_amount_of_items_on_search )
-            required_size    = force_amount_of_items_on_search * self.__indexSize
-
-            if force_amount_of_items_on_search != self.__staticsize or not self.__searchView:
-                # Cast each bytearray into a static integer type, based in the size required for
-                # represent the maximum index-value of the canvas.
-                self.__searchView = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
-                self.__modified   = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
-                self.__preserved  = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
-            self.__staticsize = force_amount_of_items_on_search
-
-        elif not self.__staticsize and (not self.__searchView or len( self.__searchView ) != size):
-            # Cast each bytearray into a static integer type, based in the size required for
-            # represent the maximum index-value of the canvas.
-            self.__searchView = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
-            self.__modified   = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
-            self.__preserved  = memoryview( bytearray(required_size) ).cast( TYPES[self.__indexSize] )
+            self.__reserve_indexes__( force_amount_of_items_on_search )
+
+        # Builds new data:
+        self.data[:size] = bytes( data[:size] ).translate( TO_STATE )
+        self.width       = width
+        self.size        = size
 
         # Always resets the indexes.
         self.__count  = 0
@@ -159,6 +234,79 @@ class Grow( object ):
         self.__cpresv = 0
 
         # Lift the information to the [$Grow-State] context.
+        if self.translate:
+            self.__lifted = False
+        else:
+            self.__lift_to_search_context__()
+
+    def __reserve__( self , capacity ):
+        """
+            ARGUMENTS
+                capacity(int): number of pixels that the data buffer must hold.
+            Makes sure that the data buffer can hold [capacity] pixels. It only
+            grows, and it grows a bit more than required, so the slowly growing
+            frames of an animation don't reallocate it each time. The index arrays
+            are reset when their indexes can't hold the new positions.
+        """
+        if capacity > self.capacity or self.data is None:
+            capacity          = max( capacity , self.capacity + (self.capacity >> 3) )
+            self.data         = bytearray( capacity )
+            self.capacity     = capacity
+            self.allocations += 1
+
+        indexSize = Grow.__get_required_bytes_for__( self.capacity )
+        if indexSize != self.__indexSize:
+            self.__indexSize  = indexSize
+            self.__indexCap   = 0
+            self.__cmodif     = 0
+            self.__cpresv     = 0
+            self.__reserve_indexes__( INDEX_CAPACITY )
+
+    def __reserve_indexes__( self , amount ):
+        """
+            ARGUMENTS
+                amount(int): number of elements that each index array must hold.
+            Makes sure that the index arrays can hold [amount] elements. When they
+            grow, their capacity is doubled (without exceeding the data capacity), and
+            the modified and preserved elements already recorded are kept.
+        """
+        if amount <= self.__indexCap:
+            return
+        amount    = max( amount , min( 2 * self.__indexCap , self.capacity ) )
+        indexSize = self.__indexSize
+        cast      = TYPES[indexSize]
+        nbytes    = amount * indexSize
+
+        # Cast each bytearray into a static integer type, based in the size required for
+        # represent the maximum index-value of the canvas.
+        modified  = memoryview( bytearray(nbytes) ).cast( cast )
+        preserved = memoryview( bytearray(nbytes) ).cast( cast )
+        if self.__indexCap:
+            modified [ :self.__cmodif ] = self.__modified [ :self.__cmodif ]
+            preserved[ :self.__cpresv ] = self.__preserved[ :self.__cpresv ]
+
+        self.__searchView = memoryview( bytearray(nbytes) ).cast( cast )
+        self.__modified   = modified
+        self.__preserved  = preserved
+        self.__indexCap   = amount
+        self.allocations += 1
+
+    def memory( self ):
+        """
+            RETURNS
+                int. Number of bytes used by the data buffer and the index arrays.
+        """
+        return len( self.data ) + 3 * self.__indexCap * self.__indexSize
+
+    def __relift__( self ):
+        """
+            Discards the [$Grow-State] context and lifts the opaque bits again.
+        """
+        size             = self.size
+        self.data[:size] = self.data[:size].translate( OPAQUE_BIT )
+        self.__count     = 0
+        self.__cmodif    = 0
+        self.__cpresv    = 0
         self.__lift_to_search_context__()
 
     def __lift_to_search_context__( self ):
@@ -166,38 +314,31 @@ class Grow( object ):
             Convert the stored raw data into a [$Grow-State] sequence. The Grow
             instance will be valid after call this method.
         """
+        self.__lifted = True
         # Search is not defined yet. We only have "modified elements" for now.
         states    = self.data
-        modified  = self.__modified
         count     = 0
-
-        # Position variables:
         rawlength = self.size
-        rows      = self.width
-        first_row = rows - 1
-        last_row  = rawlength - rows
-        last_col  = rows - 1
 
         # [$Grow-State] Access constants:
-        SEARCHRQ  = 1 << 2  # [$]
         OPAQUE    = 1       # [O]
-        IGNORE    = OPAQUE
 
-        start     = 0
-        while True:
-            pos = states.find( OPAQUE , start )
-            if pos < 0:
-                break
-            else:
-                start = pos + 1
-
-            if ( (  pos > first_row       and not states[pos - rows] & IGNORE ) or
-                 (  pos < last_row        and not states[pos + rows] & IGNORE ) or
-                 (  pos % rows            and not states[pos - 1]    & IGNORE ) or
-                 (  pos % rows < last_col and not states[pos + 1]    & IGNORE ) ):
-                # Doesn't require to add a search request:
+        if rawlength:
+            # Edge detection: The boundary pixels are the opaque ones with a transparent
+            # neighbor. These are found at once, using the data as a big integer (one byte
+            # per pixel), so only the boundary pixels are visited here.
+            opaque   = int.from_bytes( states[:rawlength] , "little" )
+            clear    = opaque ^ self.__neighbor_masks__()[2]
+            west , north , south , east = self.__neighbors_of__( clear )
+            boundary = ( opaque & (west | north | south | east) ).to_bytes( rawlength , "little" )
+
+            self.__reserve_indexes__( boundary.count( OPAQUE ) )
+            modified = self.__modified
+            pos      = boundary.find( OPAQUE )
+            while pos >= 0:
                 modified[count] = pos
                 count          += 1
+                pos = boundary.find( OPAQUE , pos + 1 )
         # Count update:
         self.__cmodif = count
         self.__context_update__()
@@ -210,6 +351,9 @@ class Grow( object ):
         # Takes a search 'log', and see which elements are opaques. If they're opaques, then
         # It will mark those that can be searched. (And adds those which aren't in the search yet).
 
+        # Each modified element adds 4 preserved elements at most:
+        self.__reserve_indexes__( min( self.size , self.__cpresv + 4 * self.__cmodif ) )
+
         # Indices & data arrays:
         states      = self.data
         search      = self.__searchView
@@ -292,11 +436,22 @@ class Grow( object ):
 
         self.__count = newcount
 
+    def hasFrontier( self ):
+        """
+            RETURNS
+                bool. True when there're elements on search, so the next
+                __run_automata__ step can change something.
+        """
+        if not self.__lifted:
+            return self.__table_states__().translate( FRONTIER ).find( 0x01 ) >= 0
+        return self.__count > 0
+
     def getSearch(self):
         """
             RETURNS
                 the search array and the elements on search.
         """
+        if not self.__lifted: self.__relift__()
         return (self.__searchView , self.__count)
 
     def __any_neighbor_policy__( self , environment ):
@@ -397,6 +552,8 @@ class Grow( object ):
 
             This modifies the internal structure of a Grow instance. Updates the
             alpha data based on the grow_policy function. """
+        if not self.__lifted: self.__relift__()
+
         # Indices & data arrays:
         newcount    = 0
         count       = self.__count
@@ -437,44 +594,222 @@ class Grow( object ):
         self.__cpresv = presv_count
         self.__context_update__()
 
+    def __neighbor_masks__( self ):
+        """
+            RETURNS
+                ( (width,size) , full , ones , west , east ). Integers (one byte per pixel) used
+                to shift the pixels without leaving the canvas:
+                    full: all bits of the canvas on.
+                    ones: 0x01 on every pixel.
+                    west: 0x01 on every pixel that has a west neighbor.
+                    east: 0x01 on every pixel that has an east neighbor.
+        """
+        width = self.width
+        size  = self.size
+        if not self.__masks or self.__masks[0] != ( width , size ):
+            height       = size // width if width else 0
+            full         = (1 << (size << 3)) - 1
+            self.__masks = ( ( width , size )                                                          ,
+                             full                                                                      ,
+                             full // 0xFF                                                              ,
+                             int.from_bytes( (b"\x00" + b"\x01" * (width - 1)) * height , "little" ) ,
+                             int.from_bytes( (b"\x01" * (width - 1) + b"\x00") * height , "little" ) )
+        return self.__masks
+
+    def __neighbors_of__( self , bits ):
+        """
+            ARGUMENTS
+                bits(int): one byte per pixel (0x00 or 0x01) as a little endian integer.
+            RETURNS
+                ( west , north , south , east ). Integers (one byte per pixel) where the
+                byte i is 0x01 when the neighbor of the pixel i in that direction is 0x01.
+        """
+        _ , full , _ , west , east = self.__neighbor_masks__()
+        rowbits = self.width << 3
+        return ( (bits << 8)       & west ,
+                 (bits << rowbits) & full ,
+                  bits >> rowbits         ,
+                 (bits >> 8)       & east )
+
+    def __table_states__( self ):
+        """
+            RETURNS
+                bytes. The [$Grow-State] of every pixel, with only its
+                Neighborhood data and its Opaque bit.
+            Used by the translate mode. The opaque bits are seen as a big
+            integer (one byte per pixel) and shifted towards each direction,
+            so the neighborhood data of the whole frame is computed at once.
+        """
+        size = self.size
+        if not size: return b""
+
+        opaque = int.from_bytes( self.data[:size].translate( OPAQUE_BIT ) , "little" )
+        west , north , south , east = self.__neighbors_of__( opaque )
+        states = ( opaque       |   # [O]
+                   west  << 7   |   # [W]
+                   north << 6   |   # [N]
+                   south << 5   |   # [S]
+                   east  << 4   )   # [E]
+        return states.to_bytes( size , "little" )
+
+    def __run_table__( self , table ):
+        """
+            ARGUMENTS
+                table($Policy-Table): decides which pixels must be opaque.
+
+            Translate mode version of __run_automata__. Updates the whole
+            alpha data at once. """
+        self.data[:self.size] = self.__table_states__().translate( table )
+        self.__lifted         = False
+
+    def __grow__( self , grow_policy ):
+        """
+            ARGUMENTS
+                grow_policy( function($Grow-State) -> int ): built-in grow policy.
+            Applies a built-in grow policy using the current mode. """
+        if self.translate:
+            name  = grow_policy.__name__
+            table = POLICY_TABLES.get( name )
+            if table is None:
+                table = POLICY_TABLES[name] = Grow.policyTable( grow_policy )
+            self.__run_table__( table )
+        else:
+            self.__run_automata__( grow_policy )
+
     def force_grow( self ):
         """ Grows always. """
-        self.__run_automata__( self.__always_grow_policy__ )
+        self.__grow__( self.__always_grow_policy__ )
 
     def any_neighbor_grow( self ):
         """" A pixel is opaque if it has an opaque neighbor. """
-        self.__run_automata__( self.__any_neighbor_policy__ )
+        self.__grow__( self.__any_neighbor_policy__ )
 
     def corners_grow( self ):
         """ A pixel is opaque if it's also a corner. """
-        self.__run_automata__( self.__is_corner_policy__ )
+        self.__grow__( self.__is_corner_policy__ )
 
     def not_corners_grow( self ):
         """ A pixel is opaque when it's not in a corner. """
-        self.__run_automata__( self.__not_corner_policy__ )
+        self.__grow__( self.__not_corner_policy__ )
 
     def strict_horizontal_grow( self ):
         """ A pixel is opaque if it doesn't have an opaque vertical neighbor. """
-        self.__run_automata__( self.__strict_horizontal_policy__ )
+        self.__grow__( self.__strict_horizontal_policy__ )
 
     def strict_vertical_grow( self ):
         """ A pixel is opaque if it doesn't have an opaque horizontal neighbor. """
-        self.__run_automata__( self.__strict_vertical_policy__ )
+        self.__grow__( self.__strict_vertical_policy__ )
+
+    def diamond_grow( self , radius ):
+        """ ARGUMENTS
+                radius(int): number of any-neighbor steps.
+            Same as applying any_neighbor_grow [radius] times. When the search is
+            big enough, it grows the opaque pixels by a diamond of that radius
+            using a two-pass Manhattan distance transform over the frame. """
+        if radius <= 0: return
+        # A step only visits the search elements, while the transform visits every pixel twice.
+        if self.__lifted and radius * self.__count < 2 * self.size:
+            for _ in range(radius):
+                self.any_neighbor_grow()
+            return
+
+        distance  = Grow.manhattan_distance( self.data , self.width , self.size , radius )
+        self.data[:self.size] = bytes( 0x01 if d <= radius else 0x00 for d in distance )
+
+        if self.translate:
+            self.__lifted = False
+        else:
+            self.__relift__()
+
+    @staticmethod
+    def manhattan_distance( data , width , size , limit ):
+        """ ARGUMENTS
+                data(bytearray):    [$Grow-State] sequence or alpha data marked with 0x01.
+                width(int):         width of the canvas.
+                size(int):          number of pixels.
+                limit(int):         distances greater than limit are reported as limit + 1.
+            RETURNS
+                [int]. Manhattan distance from each pixel to the nearest opaque pixel.
+            Computes the distance transform with a forward and a backward raster pass. """
+        far      = limit + 1
+        distance = [ 0 if data[pos] & 0x01 else far for pos in range(size) ]
+        last_col = width - 1
+
+        # Forward pass: north and west neighbors.
+        for pos in range(size):
+            d = distance[pos]
+            if d:
+                if pos >= width and distance[pos - width] + 1 < d:
+                    d = distance[pos - width] + 1
+                if pos % width and distance[pos - 1] + 1 < d:
+                    d = distance[pos - 1] + 1
+                distance[pos] = d
+
+        # Backward pass: south and east neighbors.
+        last_row = size - width
+        for pos in range(size - 1 , -1 , -1):
+            d = distance[pos]
+            if d:
+                if pos < last_row and distance[pos + width] + 1 < d:
+                    d = distance[pos + width] + 1
+                if pos % width < last_col and distance[pos + 1] + 1 < d:
+                    d = distance[pos + 1] + 1
+                distance[pos] = d
+        return distance
+
+    def shape_grow( self , shape , radius ):
+        """ ARGUMENTS
+                shape($Shape):  structuring element (see Shapes).
+                radius(int):    radius of the shape (ignored by the bitmaps).
+            Adds the pixels covered by the shape when it's centered on each opaque
+            pixel. The diamonds are made by diamond_grow, and the other shapes by
+            a few shifts of the data as a big integer (one byte per pixel). """
+        for part , r in decompose( shape , radius ):
+            if part == "diamond":
+                self.diamond_grow( r )
+                continue
+            size = self.size
+            if not size: continue
+            board = int.from_bytes( self.data[:size].translate( OPAQUE_BIT ) , "little" )
+            board = dilate( board , self.width , size // self.width , part , r , 8 )
+            self.data[:size] = board.to_bytes( size , "little" )
+
+            if self.translate:
+                self.__lifted = False
+            else:
+                self.__relift__()
+
+    def square_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a square of that radius around each opaque pixel. """
+        self.shape_grow( "square" , radius )
+
+    def octagon_grow( self , radius = 1 ):
+        """ Adds the pixels covered by an octagon of that radius around each opaque pixel. """
+        self.shape_grow( "octagon" , radius )
+
+    def disc_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a disc of that radius around each opaque pixel. """
+        self.shape_grow( "disc" , radius )
 
     def grow_with_custom_policy( self , grow_policy ):
         """ ARGUMENTS
-                grow_policy( $Grow-State -> int or bool ): Uses a function to
-                                                           decide when a pixel
-                                                           must be opaque.
+                grow_policy( ($Grow-State -> int or bool) or $Policy-Table ):
+                    Uses a function or a table to decide when a pixel must
+                    be opaque.
             A pixel is opaque if grow_policy say it. """
-        self.__run_automata__( grow_policy )
+        if self.translate:
+            # The tables given by the user are normalized too, so they give the
+            # same result as in the automata mode:
+            self.__run_table__( Grow.policyTable( Grow.policyFunction( grow_policy ) ) )
+        else:
+            self.__run_automata__( Grow.policyFunction( grow_policy ) )
 
     def unlift_data( self ):
         """ RETURNS
                 bytearray
             Returns a new bytearray without the [$Grow-State] bit field context.
             The returned data can be used outside this object. """
-        return bytearray( 0xFF if p & 0x01 else 0x00 for p in self.data )
+        return bytearray( 0xFF if self.data[i] & 0x01 else 0x00 for i in range(self.size) )
 
     def difference_with( self , external ):
         """
@@ -0,0 +1,127 @@
+# Module:   core.AlphaGrowBatch.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -------------------------------------------------
+"""
+    Grows many frames with the same size at once. The frames are stacked
+    into a single 3D array, so each grow step costs a few array operations
+    for the whole batch instead of a few per frame. It requires NumPy, so
+    importing this module raises ImportError when NumPy isn't available.
+
+    [:] Defined in this module
+    --------------------------
+        BatchGrow   :: class
+            NumpyGrow that applies each grow policy to a stack of frames. Each
+            frame gives the same result as AlphaGrow.Grow.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .AlphaGrowNumpy import NumpyGrow
+import numpy as np
+
+class BatchGrow( NumpyGrow ):
+    """
+        A BatchGrow object has the same grow methods as AlphaGrow.Grow, so a
+        compiled recipe can be applied to it with Recipe.runPlan. But it holds
+        a stack of frames with the same width and height: a 3D boolean array
+        indexed by [frame, row, column].
+
+        Its results are lists, with one element per frame (in the order given
+        to setFrames).
+
+        The grow steps are the ones of AlphaGrowNumpy.NumpyGrow, which only
+        index the rows and the columns, so each step is applied to the whole
+        stack at once. The frames never share pixels: the pixels outside each
+        frame are transparent.
+    """
+    def __init__( self , frames , width , height ):
+        """
+            ARGUMENTS
+                frames([bytearray]):    alpha data of each frame.
+                width(int):             width of the frames.
+                height(int):            height of the frames.
+        """
+        self.opaque = None  # [[[bool]]]: opaque pixels of each frame.
+        self.count  = None  # Number of frames.
+        self.size   = None  # Number of pixels of each frame.
+        self.width  = None  # Width of each column.
+        self.height = None  # Height of each row.
+        self._around = None # (opaque, neighborhood): see NumpyGrow.__neighborhood__.
+
+        # Statistics:
+        self.batches = 0    # Int: Number of batches given to setFrames.
+        self.frames  = 0    # Int: Number of frames given to setFrames.
+
+        self.setFrames( frames , width , height )
+
+    @classmethod
+    def singleton( cls ):
+        """ RETURNS
+                Trivial BatchGrow object. """
+        return cls( [] , 0 , 0 )
+
+    def setFrames( self , frames , width , height ):
+        """
+            ARGUMENTS
+                frames([bytearray]):    alpha data of each frame.
+                width(int):             width of the frames.
+                height(int):            height of the frames.
+            Smart constructor/Setter of a BatchGrow object. """
+        self.width  = width
+        self.height = height
+        self.size   = width * height
+        self.count  = len( frames )
+
+        size  = self.size
+        stack = np.zeros( ( self.count , height , width ) , dtype = np.uint8 )
+        flat  = stack.reshape( self.count , size )
+        for index , data in enumerate( frames ):
+            flat[index] = np.frombuffer( data , dtype = np.uint8 , count = size )
+        self.opaque  = stack != 0
+        self._around = None
+
+        if self.count:
+            self.batches += 1
+            self.frames  += self.count
+
+    def unlift_data( self ):
+        """ RETURNS
+                [bytearray]
+            Returns a new bytearray per frame with the opaque pixels marked as 0xFF. """
+        grown = self.opaque.reshape( self.count , self.size ).astype( np.uint8 ) * np.uint8(0xFF)
+        return [ bytearray( frame.tobytes() ) for frame in grown ]
+
+    def difference_with( self , externals ):
+        """
+            ARGUMENTS
+                externals([bytearray]): external data of each frame.
+            RETURNS
+                [bytearray]
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies difference operation while
+            between the internal and external alpha data of each frame.
+        """
+        size  = self.size
+        grown = self.opaque.reshape( self.count , size )
+        return [ bytearray( np.where( opaque , ~np.frombuffer( external , dtype = np.uint8 , count = size ) ,
+                                      np.uint8(0x00) ).astype( np.uint8 ).tobytes() ) if size else bytearray()
+                 for opaque , external in zip( grown , externals ) ]
+
+    def xor_with( self , externals ):
+        """
+            ARGUMENTS
+                externals([bytearray]): external data of each frame.
+            RETURNS
+                [bytearray]
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies xor to each frame before return
+            the new bytearray objects.
+            """
+        size  = self.size
+        grown = self.opaque.reshape( self.count , size ).astype( np.uint8 ) * np.uint8(0xFF)
+        return [ bytearray( ( np.frombuffer( external , dtype = np.uint8 , count = size ) ^ opaque ).tobytes() )
+                 if size else bytearray()
+                 for opaque , external in zip( grown , externals ) ]
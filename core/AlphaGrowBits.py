@@ -0,0 +1,284 @@
+# Module:   core.AlphaGrowBits.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -------------------------------------------------
+"""
+    Bitboard version of the AlphaGrow.Grow automata. It only uses Python's
+    built-in arbitrary-precision integers, so it doesn't need any external
+    package.
+
+    [:] Defined in this module
+    --------------------------
+        BitGrow     :: class
+            Automata that stores the whole frame as a single integer (one bit
+            per pixel) and applies each grow policy with shift/AND/OR
+            operations. It has the same interface and gives the same results
+            as AlphaGrow.Grow.
+
+        TO_BITS     :: bytes
+            Translation table. Maps alpha bytes into '0'/'1' digits.
+
+        FROM_BITS   :: bytes
+            Translation table. Maps '0'/'1' digits into 0x00/0xFF alpha bytes.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .AlphaGrow import Grow
+from .Shapes    import decompose , dilate
+TO_BITS   = b"0" + b"1" * 255
+FROM_BITS = bytes( 0xFF if c == ord("1") else 0x00 for c in range(256) )
+
+class BitGrow( object ):
+    """
+        A BitGrow object is an automata equivalent to AlphaGrow.Grow. The bit
+        i of its board is on when the pixel i is opaque, so a row of the frame
+        is a run of [width] bits and the neighbors of every pixel can be
+        computed at once:
+            west  [W] : board << 1      (except the pixels of the first column)
+            north [N] : board << width
+            south [S] : board >> width
+            east  [E] : board >> 1      (except the pixels of the last column)
+
+        Pixels outside the canvas are considered transparent, and only the
+        transparent pixels with at least one opaque neighbor (the frontier) can
+        become opaque. That's the same search criteria used by Grow.
+    """
+    def __init__( self , data , width , size ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+        """
+        self.board  = 0     # Int: bit i is on when the pixel i is opaque.
+        self.size   = None  # Number of pixels.
+        self.width  = None  # Width of each column.
+
+        # Masks:
+        self.__full     = 0 # Int: every pixel of the canvas.
+        self.__notFirst = 0 # Int: every pixel except the ones of the first column.
+        self.__notLast  = 0 # Int: every pixel except the ones of the last column.
+        self.__around   = None  # (board, neighborhood): last neighborhood, reused by the next step.
+
+        self.setData( data , width , size )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None ):
+        """ RETURNS
+                Trivial BitGrow object.
+            amount_of_items_on_search is accepted only for compatibility with Grow. """
+        return cls( bytearray() , 0 , 0 )
+
+    @staticmethod
+    def toBoard( data , size ):
+        """ ARGUMENTS
+                data(bytearray):    alpha data.
+                size(int):          number of pixels to read from data.
+            RETURNS
+                int. Where the bit i is on when data[i] isn't transparent. """
+        if not size: return 0
+        return int( bytes( data[:size] ).translate( TO_BITS )[::-1] , 2 )
+
+    @staticmethod
+    def fromBoard( board , size ):
+        """ ARGUMENTS
+                board(int): bitboard.
+                size(int):  number of pixels represented by board.
+            RETURNS
+                bytearray. Where data[i] is 0xFF when the bit i of board is on. """
+        if not size: return bytearray()
+        return bytearray( format( board , f"0{size}b" )[::-1].encode( "ascii" ).translate( FROM_BITS ) )
+
+    def setData( self , data , width , size , force_amount_of_items_on_search = None ):
+        """
+            ARGUMENTS
+                data(bytearray):                        alpha data.
+                width(int):                             width of the canvas.
+                size(int):                              size of the alpha data.
+                force_amount_of_items_on_search(int):   ignored. Kept for compatibility with Grow.
+            Smart constructor/Setter of a BitGrow object. """
+        # Rebuild the column masks only when the canvas shape changes:
+        if width != self.width or size != self.size:
+            height          = size // width if width else 0
+            self.__full     = (1 << size) - 1
+            self.__notFirst = BitGrow.toBoard( (b"\x00" + b"\xff" * (width - 1)) * height , size ) if width else 0
+            self.__notLast  = BitGrow.toBoard( (b"\xff" * (width - 1) + b"\x00") * height , size ) if width else 0
+
+        self.width = width
+        self.size  = size
+        self.board = BitGrow.toBoard( data , size )
+        self.__around = None
+
+    def __neighborhood__( self ):
+        """
+            RETURNS
+                ( west , north , south , east ). Bitboards where the bit i is
+                on when the pixel i has an opaque neighbor in that direction.
+            The last one is kept (with the board it was made from), so the step
+            that follows a hasFrontier check doesn't compute it again.
+        """
+        board = self.board
+        width = self.width
+        if self.__around is not None and self.__around[0] is board:
+            return self.__around[1]
+        neighborhood  = ( (board << 1)     & self.__notFirst ,
+                          (board << width) & self.__full     ,
+                           board >> width                    ,
+                          (board >> 1)     & self.__notLast  )
+        self.__around = ( board , neighborhood )
+        return neighborhood
+
+    def __run_automata__( self , grow_mask ):
+        """
+            ARGUMENTS
+                grow_mask( function(west,north,south,east) -> int ):
+                    Takes the neighborhood bitboards and returns which pixels
+                    of the frontier must be opaque.
+
+            Updates the board using a whole frame policy. """
+        west , north , south , east = self.__neighborhood__()
+        frontier    = (west | north | south | east) & ~self.board
+        self.board |= frontier & grow_mask( west , north , south , east )
+
+    def force_grow( self ):
+        """ Grows always. """
+        self.__run_automata__( lambda w , n , s , e: -1 )
+
+    def any_neighbor_grow( self ):
+        """" A pixel is opaque if it has an opaque neighbor. """
+        self.__run_automata__( lambda w , n , s , e: -1 )
+
+    def corners_grow( self ):
+        """ A pixel is opaque if it's also a corner. """
+        self.__run_automata__( lambda w , n , s , e: (w ^ e) & (n ^ s) )
+
+    def not_corners_grow( self ):
+        """ A pixel is opaque when it's not in a corner. """
+        self.__run_automata__( lambda w , n , s , e: ~( (w ^ e) & (n ^ s) ) )
+
+    def strict_horizontal_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque vertical neighbor. """
+        self.__run_automata__( lambda w , n , s , e: (w | e) & ~(n | s) )
+
+    def strict_vertical_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque horizontal neighbor. """
+        self.__run_automata__( lambda w , n , s , e: (n | s) & ~(w | e) )
+
+    def diamond_grow( self , radius ):
+        """ ARGUMENTS
+                radius(int): number of any-neighbor steps.
+            Same as applying any_neighbor_grow [radius] times. Each step only
+            costs a few operations over the whole board, so it just stops when
+            the board doesn't change anymore. """
+        for _ in range(radius):
+            board = self.board
+            self.any_neighbor_grow()
+            if board == self.board: break
+
+    def shape_grow( self , shape , radius ):
+        """ ARGUMENTS
+                shape($Shape):  structuring element (see Shapes).
+                radius(int):    radius of the shape (ignored by the bitmaps).
+            Adds the pixels covered by the shape when it's centered on each opaque
+            pixel. """
+        for part , r in decompose( shape , radius ):
+            if part == "diamond":
+                self.diamond_grow( r )
+            elif self.size:
+                self.board = dilate( self.board , self.width , self.size // self.width , part , r , 1 )
+
+    def square_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a square of that radius around each opaque pixel. """
+        self.shape_grow( "square" , radius )
+
+    def octagon_grow( self , radius = 1 ):
+        """ Adds the pixels covered by an octagon of that radius around each opaque pixel. """
+        self.shape_grow( "octagon" , radius )
+
+    def disc_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a disc of that radius around each opaque pixel. """
+        self.shape_grow( "disc" , radius )
+
+    def grow_with_custom_policy( self , grow_policy ):
+        """ ARGUMENTS
+                grow_policy( ($Grow-State -> int or bool) or $Policy-Table ):
+                    Uses a function or a table (see AlphaGrow.Grow.policyTable)
+                    to decide when a pixel must be opaque.
+            A pixel is opaque if grow_policy say it. The policy is evaluated
+            once per neighborhood, and the neighborhoods accepted by it are
+            joined as a sum of products of the direction bitboards. """
+        SEARCHRQ    = 1 << 2
+        grow_policy = Grow.policyFunction( grow_policy )
+        accepted    = [ nibble for nibble in range(16) if grow_policy( (nibble << 4) | SEARCHRQ ) ]
+
+        def grow_mask( west , north , south , east ):
+            mask = 0
+            for nibble in accepted:
+                term = -1
+                for bit , direction in ( (8 , west) , (4 , north) , (2 , south) , (1 , east) ):
+                    term &= direction if nibble & bit else ~direction
+                mask |= term
+            return mask
+        self.__run_automata__( grow_mask )
+
+    def hasFrontier( self ):
+        """
+            RETURNS
+                bool. True when a transparent pixel has an opaque neighbor,
+                so the next step can change something.
+        """
+        west , north , south , east = self.__neighborhood__()
+        return ( (west | north | south | east) & ~self.board ) != 0
+
+    def getSearch( self ):
+        """
+            RETURNS
+                the search array and the elements on search.
+        """
+        west , north , south , east = self.__neighborhood__()
+        frontier = BitGrow.fromBoard( (west | north | south | east) & ~self.board , self.size )
+        search   = []
+        pos      = frontier.find( 0xFF )
+        while pos >= 0:
+            search.append( pos )
+            pos = frontier.find( 0xFF , pos + 1 )
+        return ( search , len(search) )
+
+    def unlift_data( self ):
+        """ RETURNS
+                bytearray
+            Returns a new bytearray with the opaque pixels marked as 0xFF. """
+        return BitGrow.fromBoard( self.board , self.size )
+
+    def difference_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply difference with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies difference operation while
+            between the internal and external alpha data.
+        """
+        # NOTE: Alpha data only holds 0x00 and 0xFF values, so the difference is
+        #       equivalent to a bitwise difference between the bitboards.
+        size = self.size
+        return BitGrow.fromBoard( self.board & ~BitGrow.toBoard( external , size ) , size )
+
+    def xor_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply xor with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies xor before return the new
+            bytearray object.
+            """
+        size = self.size
+        if not size: return bytearray()
+        mask = int.from_bytes( self.unlift_data() , "little" )
+        return bytearray( (int.from_bytes( external[:size] , "little" ) ^ mask).to_bytes( size , "little" ) )
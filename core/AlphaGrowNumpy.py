@@ -0,0 +1,308 @@
+# Module:   core.AlphaGrowNumpy.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -------------------------------------------------
+"""
+    Array based version of the AlphaGrow.Grow automata. It requires NumPy,
+    so importing this module raises ImportError when NumPy isn't available.
+
+    [:] Defined in this module
+    --------------------------
+        NumpyGrow   :: class
+            Automata that applies each grow policy to the whole frame at once
+            using shift/mask operations over boolean arrays. It has the same
+            interface and gives the same results as AlphaGrow.Grow.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .AlphaGrow import Grow
+from .Shapes    import decompose , dilateWith , _Shifter
+import numpy as np
+
+def _shift( board , k , axis ):
+    """
+        ARGUMENTS
+            board([[bool]]):    frame (or stack of frames).
+            k(int):             number of pixels moved (towards the end of the axis when k > 0).
+            axis(int):          -2 for the rows, -1 for the columns.
+        RETURNS
+            [[bool]]. A new board moved k pixels along the axis. The pixels moved
+            outside the frames are lost, and the new ones are transparent.
+    """
+    result = np.zeros_like( board )
+    length = board.shape[axis]
+    if abs(k) >= length:
+        return result
+    source = [ slice(None) ] * board.ndim
+    target = [ slice(None) ] * board.ndim
+    if k > 0:
+        source[axis] , target[axis] = slice( None , length - k ) , slice( k , None )
+    else:
+        source[axis] , target[axis] = slice( -k , None ) , slice( None , length + k )
+    result[ tuple(target) ] = board[ tuple(source) ]
+    return result
+
+class _ArrayShifter( _Shifter ):
+    """ Shifts a boolean array: a frame or every frame of a stack (see Shapes.dilateWith). """
+    def __init__( self ):
+        pass
+
+    def horizontal( self , board , k ):
+        """ RETURNS
+                [[bool]]. Board moved k columns towards the east (or the west when k < 0). """
+        return _shift( board , k , -1 ) if k else board
+
+    def vertical( self , board , k ):
+        """ RETURNS
+                [[bool]]. Board moved k rows towards the south (or the north when k < 0). """
+        return _shift( board , k , -2 ) if k else board
+
+class NumpyGrow( object ):
+    """
+        A NumpyGrow object is an automata equivalent to AlphaGrow.Grow, but
+        it keeps the opaque pixels in a 2D boolean array instead of a
+        [$Grow-State] bytearray.
+
+        The grow steps only index the last two axes of the array (the rows and
+        the columns), so they work on a stack of frames too: see
+        AlphaGrowBatch.BatchGrow, which only changes how the data is set and
+        returned.
+
+        On each step, the neighborhood of every pixel is computed by shifting
+        the opaque array one pixel towards each direction:
+            west  [W] : opaque[ y   , x-1 ]
+            north [N] : opaque[ y-1 , x   ]
+            south [S] : opaque[ y+1 , x   ]
+            east  [E] : opaque[ y   , x+1 ]
+
+        Pixels outside the canvas are considered transparent, and only the
+        transparent pixels with at least one opaque neighbor (the frontier) can
+        become opaque. That's the same search criteria used by Grow.
+    """
+    def __init__( self , data , width , size ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+        """
+        self.opaque = None  # [[bool]]: opaque pixels.
+        self.size   = None  # Number of pixels.
+        self.width  = None  # Width of each column.
+        self.height = None  # Height of each row.
+        self._around = None # (opaque, neighborhood): last neighborhood, reused by the next step.
+
+        self.setData( data , width , size )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None ):
+        """ RETURNS
+                Trivial NumpyGrow object.
+            amount_of_items_on_search is accepted only for compatibility with Grow. """
+        return cls( bytearray() , 0 , 0 )
+
+    def setData( self , data , width , size , force_amount_of_items_on_search = None ):
+        """
+            ARGUMENTS
+                data(bytearray):                        alpha data.
+                width(int):                             width of the canvas.
+                size(int):                              size of the alpha data.
+                force_amount_of_items_on_search(int):   ignored. Kept for compatibility with Grow.
+            Smart constructor/Setter of a NumpyGrow object. """
+        self.width  = width
+        self.size   = size
+        self.height = size // width if width else 0
+
+        raw = np.frombuffer( data , dtype = np.uint8 , count = size ) if size else np.zeros( 0 , dtype = np.uint8 )
+        self.opaque  = ( raw != 0 ).reshape( self.height , self.width )
+        self._around = None
+
+    def __neighborhood__( self ):
+        """
+            RETURNS
+                ( west , north , south , east ). Boolean arrays that are True
+                when the pixel has an opaque neighbor in that direction.
+            The last one is kept, so the step that follows a hasFrontier check
+            doesn't compute it again. The steps replace the opaque array (they
+            never change it in place), so it's known to be the same.
+        """
+        opaque = self.opaque
+        if self._around is not None and self._around[0] is opaque:
+            return self._around[1]
+        west   = np.zeros_like( opaque )
+        north  = np.zeros_like( opaque )
+        south  = np.zeros_like( opaque )
+        east   = np.zeros_like( opaque )
+
+        west [ ... , : , 1:  ] = opaque[ ... , : , :-1 ]
+        north[ ... , 1:  , : ] = opaque[ ... , :-1 , : ]
+        south[ ... , :-1 , : ] = opaque[ ... , 1:  , : ]
+        east [ ... , : , :-1 ] = opaque[ ... , : , 1:  ]
+        self._around = ( opaque , ( west , north , south , east ) )
+        return ( west , north , south , east )
+
+    def __frontier__( self , west , north , south , east ):
+        """ RETURNS
+                Boolean array with the transparent pixels that have an opaque neighbor. """
+        return ~self.opaque & ( west | north | south | east )
+
+    def __run_automata__( self , grow_mask ):
+        """
+            ARGUMENTS
+                grow_mask( function(west,north,south,east) -> [[bool]] ):
+                    Takes the neighborhood arrays and returns which pixels of
+                    the frontier must be opaque.
+
+            Updates the opaque array using a whole frame policy. """
+        if not self.opaque.size: return
+        west , north , south , east = self.__neighborhood__()
+        frontier = self.__frontier__( west , north , south , east )
+        self.opaque  = self.opaque | ( frontier & grow_mask( west , north , south , east ) )
+        self._around = None
+
+    def force_grow( self ):
+        """ Grows always. """
+        self.__run_automata__( lambda w , n , s , e: True )
+
+    def any_neighbor_grow( self ):
+        """" A pixel is opaque if it has an opaque neighbor. """
+        self.__run_automata__( lambda w , n , s , e: True )
+
+    def corners_grow( self ):
+        """ A pixel is opaque if it's also a corner. """
+        self.__run_automata__( lambda w , n , s , e: (w ^ e) & (n ^ s) )
+
+    def not_corners_grow( self ):
+        """ A pixel is opaque when it's not in a corner. """
+        self.__run_automata__( lambda w , n , s , e: ~( (w ^ e) & (n ^ s) ) )
+
+    def strict_horizontal_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque vertical neighbor. """
+        self.__run_automata__( lambda w , n , s , e: (w | e) & ~(n | s) )
+
+    def strict_vertical_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque horizontal neighbor. """
+        self.__run_automata__( lambda w , n , s , e: (n | s) & ~(w | e) )
+
+    def diamond_grow( self , radius ):
+        """ ARGUMENTS
+                radius(int): number of any-neighbor steps.
+            Same as applying any_neighbor_grow [radius] times. It grows the
+            opaque pixels by a diamond of that radius using a Manhattan
+            distance transform (one forward and one backward pass per axis). """
+        if radius <= 0 or not self.opaque.size: return
+        if radius < 3:
+            for _ in range(radius):
+                self.any_neighbor_grow()
+            return
+
+        height , width = self.opaque.shape[-2:]
+        distance = np.where( self.opaque , 0 , height + width ).astype( np.int32 )
+        for y in range( 1 , height ):
+            np.minimum( distance[...,y,:] , distance[...,y - 1,:] + 1 , out = distance[...,y,:] )
+        for y in range( height - 2 , -1 , -1 ):
+            np.minimum( distance[...,y,:] , distance[...,y + 1,:] + 1 , out = distance[...,y,:] )
+        for x in range( 1 , width ):
+            np.minimum( distance[...,x] , distance[...,x - 1] + 1 , out = distance[...,x] )
+        for x in range( width - 2 , -1 , -1 ):
+            np.minimum( distance[...,x] , distance[...,x + 1] + 1 , out = distance[...,x] )
+        self.opaque = distance <= radius
+
+    def shape_grow( self , shape , radius ):
+        """ ARGUMENTS
+                shape($Shape):  structuring element (see Shapes).
+                radius(int):    radius of the shape (ignored by the bitmaps).
+            Adds the pixels covered by the shape when it's centered on each opaque
+            pixel. The shapes (except the diamonds) are made by shifting the opaque
+            array, see Shapes.dilateWith. """
+        for part , r in decompose( shape , radius ):
+            if part == "diamond":
+                self.diamond_grow( r )
+            elif self.opaque.size:
+                self.opaque = dilateWith( _ArrayShifter() , self.opaque , part , r )
+
+    def square_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a square of that radius around each opaque pixel. """
+        self.shape_grow( "square" , radius )
+
+    def octagon_grow( self , radius = 1 ):
+        """ Adds the pixels covered by an octagon of that radius around each opaque pixel. """
+        self.shape_grow( "octagon" , radius )
+
+    def disc_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a disc of that radius around each opaque pixel. """
+        self.shape_grow( "disc" , radius )
+
+    def grow_with_custom_policy( self , grow_policy ):
+        """ ARGUMENTS
+                grow_policy( ($Grow-State -> int or bool) or $Policy-Table ):
+                    Uses a function or a table (see AlphaGrow.Grow.policyTable)
+                    to decide when a pixel must be opaque.
+            A pixel is opaque if grow_policy say it. The policy is evaluated
+            once per neighborhood, so it's called 16 times at most. """
+        SEARCHRQ    = 1 << 2
+        grow_policy = Grow.policyFunction( grow_policy )
+        table       = np.array( [ bool(grow_policy( (nibble << 4) | SEARCHRQ )) for nibble in range(16) ] )
+
+        def grow_mask( west , north , south , east ):
+            nibble = ( (west .astype( np.uint8 ) << 3) |
+                       (north.astype( np.uint8 ) << 2) |
+                       (south.astype( np.uint8 ) << 1) |
+                        east .astype( np.uint8 )       )
+            return table[ nibble ]
+        self.__run_automata__( grow_mask )
+
+    def hasFrontier( self ):
+        """
+            RETURNS
+                bool. True when a transparent pixel has an opaque neighbor,
+                so the next step can change something.
+        """
+        return bool( self.opaque.size ) and bool( self.__frontier__( *self.__neighborhood__() ).any() )
+
+    def getSearch( self ):
+        """
+            RETURNS
+                the search array and the elements on search.
+        """
+        if not self.size:
+            return ( np.zeros( 0 , dtype = np.intp ) , 0 )
+        search = np.flatnonzero( self.__frontier__( *self.__neighborhood__() ) )
+        return ( search , len(search) )
+
+    def unlift_data( self ):
+        """ RETURNS
+                bytearray
+            Returns a new bytearray with the opaque pixels marked as 0xFF. """
+        return bytearray( (self.opaque.astype( np.uint8 ) * np.uint8(0xFF)).tobytes() )
+
+    def difference_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply difference with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies difference operation while
+            between the internal and external alpha data.
+        """
+        if not self.size: return bytearray()
+        ext = np.frombuffer( external , dtype = np.uint8 , count = self.size )
+        return bytearray( np.where( self.opaque.ravel() , ~ext , np.uint8(0x00) ).astype( np.uint8 ).tobytes() )
+
+    def xor_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply xor with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies xor before return the new
+            bytearray object.
+            """
+        if not self.size: return bytearray()
+        ext = np.frombuffer( external , dtype = np.uint8 , count = self.size )
+        return bytearray( (ext ^ (self.opaque.ravel().astype( np.uint8 ) * np.uint8(0xFF))).tobytes() )
@@ -0,0 +1,771 @@
+# Module:   core.AlphaGrowRegions.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# ---------------------------------------------------
+"""
+    Grow engines that split a frame into smaller regions and only grow the
+    regions that can change.
+
+    The result of a pixel after [k] grow steps only depends on the pixels
+    around it (at most [k] pixels away in each direction). So a region of the
+    frame can be grown on its own when it's extended by a halo of [k] pixels.
+    Only the interior of the region is kept.
+
+    [:] Defined in this module
+    --------------------------
+        RegionGrow  :: class
+            Base class of the region based engines. Records the grow steps and
+            applies them to each region when the result is requested.
+
+        TileGrow    :: class
+            Splits the frame into fixed-size tiles and only grows the tiles
+            that are near the opaque pixels.
+
+        PatchGrow   :: class
+            Reuses the result of the previous frame, and only grows the
+            rectangle where the current frame is different.
+
+        BandGrow    :: class
+            Grows the frame by horizontal bands, one at a time, so the memory
+            used depends on the height of the bands instead of the frame.
+
+        ComponentGrow :: class
+            Labels the connected components (blobs) of the frame, groups the
+            ones that are close enough to touch each other after growing, and
+            only grows a tight box around each group.
+
+        components  :: func( bytearray , int , int ) -> [(int,int,int,int)]
+            Bounding boxes of the connected components of a frame.
+
+        crop        :: func( bytearray , int , int , int , int , int ) -> bytearray
+            Copies a rectangle of a frame.
+
+        paste       :: func( bytearray , int , bytearray , int , int , int , int ) -> IO ()
+            Writes a rectangle into a frame.
+
+        ALPHA       :: bytes
+            Translation table. Maps any alpha data into 0x00/0xFF values.
+
+        TILE_SIZE   :: int
+            Default tile size (in pixels) of TileGrow.
+
+        BAND_HEIGHT :: int
+            Default band height (in rows) of BandGrow.
+
+        PATCH_RATIO :: float
+            PatchGrow grows the whole frame when the rectangle that must be
+            grown again covers more than this fraction of the frame.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .Engines import ENGINE
+from .Shapes  import reach
+import re
+
+RUNS        = re.compile( rb"[^\x00]+" )
+
+ALPHA       = b"\x00" + b"\xff" * 255
+TILE_SIZE   = 64
+BAND_HEIGHT = 256
+PATCH_RATIO = 0.5
+
+def crop( data , width , x , y , w , h ):
+    """
+        ARGUMENTS
+            data(bytearray):    frame data (one byte per pixel).
+            width(int):         width of the frame.
+            x , y(int):         top-left corner of the rectangle.
+            w , h(int):         size of the rectangle.
+        RETURNS
+            bytearray. The pixels of the rectangle.
+    """
+    view = memoryview( data )
+    return bytearray( b"".join( view[ row * width + x : row * width + x + w ] for row in range( y , y + h ) ) )
+
+def paste( target , width , data , x , y , w , h ):
+    """
+        ARGUMENTS
+            target(bytearray):  frame data (one byte per pixel).
+            width(int):         width of the frame.
+            data(bytearray):    rectangle data.
+            x , y(int):         top-left corner of the rectangle in the frame.
+            w , h(int):         size of the rectangle.
+        Writes the rectangle data into the frame.
+    """
+    for row in range(h):
+        start = (y + row) * width + x
+        target[ start : start + w ] = data[ row * w : row * w + w ]
+
+def components( data , width , height ):
+    """
+        ARGUMENTS
+            data(bytearray):        frame data (one byte per pixel).
+            width , height(int):    size of the frame.
+        RETURNS
+            [(x0,y0,x1,y1)]. Bounding box of each connected component of the opaque
+            pixels (4-connected), where the ends x1 and y1 are exclusive.
+        The components are labeled by horizontal runs: the runs of a row are joined
+        with the runs of the previous row that share a column.
+    """
+    parent = []     # [int]: union-find of the runs.
+    boxes  = []     # [[x0,y0,x1,y1]]: box of each run.
+
+    def root( run ):
+        while parent[run] != run:
+            parent[run] = parent[ parent[run] ]
+            run         = parent[run]
+        return run
+
+    above = []      # [(x0,x1,int)]: runs of the previous row.
+    for y in range(height):
+        start = y * width
+        if data.count( 0 , start , start + width ) == width:
+            above = []
+            continue
+        current = []
+        index   = 0     # First run of the previous row that can share a column.
+        for match in RUNS.finditer( data , start , start + width ):
+            x0 , x1 = match.start() - start , match.end() - start
+            run     = len( parent )
+            parent.append( run )
+            boxes.append( [ x0 , y , x1 , y + 1 ] )
+            while index < len( above ) and above[index][1] <= x0:
+                index += 1
+            other = index
+            while other < len( above ) and above[other][0] < x1:
+                a , b = root( above[other][2] ) , root( run )
+                if a != b: parent[b] = a
+                other += 1
+            if other > index: index = other - 1
+            current.append( ( x0 , x1 , run ) )
+        above = current
+
+    merged = {}
+    for run , box in enumerate( boxes ):
+        top = root( run )
+        if top not in merged:
+            merged[top] = box
+        else:
+            group = merged[top]
+            group[0] , group[1] = min( group[0] , box[0] ) , min( group[1] , box[1] )
+            group[2] , group[3] = max( group[2] , box[2] ) , max( group[3] , box[3] )
+    return [ tuple(box) for box in merged.values() ]
+
+class RegionGrow( object ):
+    """
+        A RegionGrow object has the same interface as AlphaGrow.Grow, but its
+        grow methods only record the steps. These are applied to each region
+        given by __regions__ (using an inner Grow engine) when the result is
+        requested by unlift_data, difference_with or xor_with.
+
+        The steps are kept as (kernel, args, radius), where radius is the
+        number of pixels that a step can grow.
+    """
+    def __init__( self , data , width , size , engine = None ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each region. Uses Engines.ENGINE when it's None.
+        """
+        self.data   = None  # User canvas data.
+        self.size   = None  # Number of pixels.
+        self.width  = None  # Width of each column.
+        self.height = None  # Height of each row.
+        self.steps  = []    # [(str,tuple,int)]: recorded steps.
+
+        self.engine  = engine or ENGINE
+        self.inner   = self.engine.singleton()
+        self.regions = 0    # Int: Number of regions grown in the last result.
+
+        self._grown   = None    # bytearray: Result. None when it must be computed again.
+        self._content = False   # Bool: data has opaque pixels.
+        self._holes   = False   # Bool: data has transparent pixels.
+
+        self.setData( data , width , size )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None , engine = None ):
+        """ RETURNS
+                Trivial RegionGrow object.
+            amount_of_items_on_search is accepted only for compatibility with Grow. """
+        return cls( bytearray() , 0 , 0 , engine )
+
+    def setData( self , data , width , size , force_amount_of_items_on_search = None ):
+        """
+            ARGUMENTS
+                data(bytearray):                        alpha data.
+                width(int):                             width of the canvas.
+                size(int):                              size of the alpha data.
+                force_amount_of_items_on_search(int):   ignored. Kept for compatibility with Grow.
+            Smart constructor/Setter of a RegionGrow object. """
+        self.data   = data
+        self.width  = width
+        self.size   = size
+        self.height = size // width if width else 0
+        self.steps  = []
+
+        transparent   = data.count( 0 , 0 , size ) if size else 0
+        self._grown   = None
+        self._content = transparent < size
+        self._holes   = transparent > 0
+
+    def thickness( self ):
+        """ RETURNS
+                int. Number of pixels that the recorded steps can grow. """
+        return sum( radius for _ , _ , radius in self.steps )
+
+    def __record__( self , kernel , args = () , radius = 1 ):
+        """ Records a grow step. """
+        self.steps.append( ( kernel , args , radius ) )
+        self._grown = None
+
+    def force_grow( self ):
+        """ Grows always. """
+        self.__record__( "force_grow" )
+
+    def any_neighbor_grow( self ):
+        """" A pixel is opaque if it has an opaque neighbor. """
+        self.__record__( "any_neighbor_grow" )
+
+    def corners_grow( self ):
+        """ A pixel is opaque if it's also a corner. """
+        self.__record__( "corners_grow" )
+
+    def not_corners_grow( self ):
+        """ A pixel is opaque when it's not in a corner. """
+        self.__record__( "not_corners_grow" )
+
+    def strict_horizontal_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque vertical neighbor. """
+        self.__record__( "strict_horizontal_grow" )
+
+    def strict_vertical_grow( self ):
+        """ A pixel is opaque if it doesn't have an opaque horizontal neighbor. """
+        self.__record__( "strict_vertical_grow" )
+
+    def diamond_grow( self , radius ):
+        """ Same as applying any_neighbor_grow [radius] times. """
+        if radius > 0:
+            self.__record__( "diamond_grow" , (radius,) , radius )
+
+    def shape_grow( self , shape , radius ):
+        """ Adds the pixels covered by the shape around each opaque pixel. """
+        grown = reach( shape , radius )
+        if grown > 0:
+            self.__record__( "shape_grow" , (shape , radius) , grown )
+
+    def square_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a square of that radius around each opaque pixel. """
+        self.shape_grow( "square" , radius )
+
+    def octagon_grow( self , radius = 1 ):
+        """ Adds the pixels covered by an octagon of that radius around each opaque pixel. """
+        self.shape_grow( "octagon" , radius )
+
+    def disc_grow( self , radius = 1 ):
+        """ Adds the pixels covered by a disc of that radius around each opaque pixel. """
+        self.shape_grow( "disc" , radius )
+
+    def grow_with_custom_policy( self , grow_policy ):
+        """ A pixel is opaque if grow_policy say it. """
+        self.__record__( "grow_with_custom_policy" , (grow_policy,) )
+
+    def hasFrontier( self ):
+        """
+            RETURNS
+                bool. False when the steps can't change anything, because the
+                frame is empty or full.
+        """
+        return self._content and self._holes
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                iterable of (x,y,w,h). Rectangles that must be grown. The pixels
+                outside them can't change.
+            Implemented by subclasses. """
+        return [ ( 0 , 0 , self.width , self.height ) ]
+
+    def __grow_window__( self , x , y , w , h , halo ):
+        """
+            ARGUMENTS
+                x , y , w , h(int): rectangle that will be grown.
+                halo(int):          extra pixels read around the rectangle.
+            RETURNS
+                bytearray or None. The rectangle grown by the inner engine, or None
+                when the steps can't change it. """
+        width  = self.width
+        height = self.height
+        left   = max( 0 , x - halo )
+        top    = max( 0 , y - halo )
+        right  = min( width  , x + w + halo )
+        bottom = min( height , y + h + halo )
+        wwidth = right - left
+
+        window      = crop( self.data , width , left , top , wwidth , bottom - top )
+        transparent = window.count( 0 )
+        if not transparent or transparent == len( window ):
+            return None # Full or empty: nothing can change.
+
+        inner = self.inner
+        inner.setData( window , wwidth , len( window ) )
+        for kernel , args , _ in self.steps:
+            getattr( inner , kernel )( *args )
+        grown = inner.unlift_data()
+
+        self.regions += 1
+        return crop( grown , wwidth , x - left , y - top , w , h )
+
+    def __grow_region__( self , x , y , w , h , halo ):
+        """
+            ARGUMENTS
+                x , y , w , h(int): rectangle that will be grown.
+                halo(int):          extra pixels read around the rectangle.
+            Grows the rectangle using the inner engine, and writes its interior
+            into the result. """
+        interior = self.__grow_window__( x , y , w , h , halo )
+        if interior is not None:
+            paste( self._grown , self.width , interior , x , y , w , h )
+
+    def __initial__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                bytearray. Result used outside the regions given by __regions__.
+            Implemented by subclasses. """
+        return self.data[ :self.size ].translate( ALPHA )
+
+    def __halo__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                int. Extra pixels read around each region. The regions only need
+                the [thickness] pixels around them. Implemented by subclasses. """
+        return thickness
+
+    def __grow_regions__( self , regions , thickness ):
+        """
+            ARGUMENTS
+                regions([(x,y,w,h)]):   rectangles that must be grown.
+                thickness(int):         number of pixels that the recorded steps can grow.
+            Grows each region into the result (see __grow_region__). """
+        halo = self.__halo__( thickness )
+        for x , y , w , h in regions:
+            self.__grow_region__( x , y , w , h , halo )
+
+    def __materialise__( self ):
+        """
+            RETURNS
+                bytearray. The opaque pixels (0xFF) after applying the recorded steps.
+        """
+        if self._grown is None:
+            self._grown  = self.__initial__( self.thickness() )
+            self.regions = 0
+            if self.steps and self.hasFrontier():
+                thickness = self.thickness()
+                self.__grow_regions__( self.__regions__( thickness ) , thickness )
+        return self._grown
+
+    def unlift_data( self ):
+        """ RETURNS
+                bytearray
+            Returns a new bytearray with the opaque pixels marked as 0xFF. """
+        return bytearray( self.__materialise__() )
+
+    def difference_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply difference with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies difference operation while
+            between the internal and external alpha data.
+        """
+        size  = self.size
+        grown = self.__materialise__()
+        if not size: return bytearray()
+        # NOTE: grown only holds 0x00 and 0xFF, so the bytes don't mix in these operations.
+        return bytearray( ( int.from_bytes( grown , "little" ) &
+                            ~int.from_bytes( external[:size] , "little" ) ).to_bytes( size , "little" ) )
+
+    def xor_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply xor with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies xor before return the new
+            bytearray object.
+            """
+        size  = self.size
+        grown = self.__materialise__()
+        if not size: return bytearray()
+        return bytearray( ( int.from_bytes( grown , "little" ) ^
+                            int.from_bytes( external[:size] , "little" ) ).to_bytes( size , "little" ) )
+
+class TileGrow( RegionGrow ):
+    """
+        Splits the frame into square tiles. Only the tiles with opaque pixels,
+        and the ones close enough to them to be reached by the border, are
+        grown. The other tiles are never copied nor searched, so the work done
+        depends on the amount of content instead of the canvas area.
+    """
+    def __init__( self , data , width , size , engine = None , tileSize = TILE_SIZE ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each tile.
+                tileSize(int):      minimal size of each tile.
+        """
+        self.tileSize = tileSize
+        super().__init__( data , width , size , engine )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None , engine = None , tileSize = TILE_SIZE ):
+        """ RETURNS
+                Trivial TileGrow object. """
+        return cls( bytearray() , 0 , 0 , engine , tileSize )
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                [(x,y,w,h)]. The tiles that have opaque pixels or that are
+                close enough to them.
+        """
+        data   = self.data
+        width  = self.width
+        height = self.height
+        # Big halos are expensive compared with small tiles:
+        tile   = max( self.tileSize , 2 * thickness )
+        cols   = (width  + tile - 1) // tile
+        rows   = (height + tile - 1) // tile
+
+        # Tiles with opaque pixels:
+        content = set()
+        for y in range(height):
+            start = y * width
+            if data.count( 0 , start , start + width ) == width:
+                continue
+            ty = y // tile
+            for tx in range(cols):
+                if ( tx , ty ) in content: continue
+                x0 = start + tx * tile
+                x1 = min( x0 + tile , start + width )
+                if data.count( 0 , x0 , x1 ) != x1 - x0:
+                    content.add( ( tx , ty ) )
+
+        # Tiles within [thickness] pixels of the content:
+        reach  = (thickness + tile - 1) // tile
+        active = { ( tx + dx , ty + dy )
+                   for tx , ty in content
+                   for dx in range( -reach , reach + 1 )
+                   for dy in range( -reach , reach + 1 )
+                   if 0 <= tx + dx < cols and 0 <= ty + dy < rows }
+
+        return [ ( tx * tile , ty * tile , min( tile , width - tx * tile ) , min( tile , height - ty * tile ) )
+                 for ty , tx in sorted( ( ty , tx ) for tx , ty in active ) ]
+
+class PatchGrow( RegionGrow ):
+    """
+        Keeps the last frame and its result. When the next frame has the same
+        shape and the same steps, only the pixels within [thickness] pixels of
+        the changes can have a different result, so only the bounding box of
+        the changes (expanded by the thickness) is grown again, and it's
+        pasted over the previous result.
+
+        Frames without a usable previous frame, or with too many changes
+        (see PATCH_RATIO), are grown as a whole.
+    """
+    def __init__( self , data , width , size , engine = None ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on the changed rectangle.
+        """
+        self.previous = None    # (data, result, width, size, steps): last frame with a result.
+        self.patched  = 0       # Int: Number of frames made from the previous result.
+        self._dirty   = None    # (x,y,w,h) or None: rectangle grown in the last result.
+        super().__init__( data , width , size , engine )
+
+    def setData( self , data , width , size , force_amount_of_items_on_search = None ):
+        """
+            ARGUMENTS
+                data(bytearray):                        alpha data.
+                width(int):                             width of the canvas.
+                size(int):                              size of the alpha data.
+                force_amount_of_items_on_search(int):   ignored. Kept for compatibility with Grow.
+            Keeps the current frame (when it has a result) and sets the new one. """
+        if self._grown is not None:
+            self.previous = ( bytes( self.data[:self.size] ) , self._grown , self.width , self.size , self.steps )
+        super().setData( data , width , size )
+
+    def changes( self ):
+        """
+            RETURNS
+                (x,y,w,h) or None. Bounding box of the pixels that are different
+                from the previous frame. None when the previous frame can't be used.
+        """
+        previous = self.previous
+        if previous is None: return None
+        data , _ , width , size , steps = previous
+        if width != self.width or size != self.size or steps != self.steps:
+            return None
+        if not size: return ( 0 , 0 , 0 , 0 )
+
+        # NOTE: The frames are compared as big integers. Any different byte is a change.
+        diff = ( int.from_bytes( data[:size] , "little" ) ^
+                 int.from_bytes( self.data[:size] , "little" ) )
+        if not diff: return ( 0 , 0 , 0 , 0 )
+        diff = diff.to_bytes( size , "little" ).translate( ALPHA )
+
+        top    = diff.find( 0xFF ) // width
+        bottom = diff.rfind( 0xFF ) // width + 1
+        left   = width
+        right  = 0
+        for y in range( top , bottom ):
+            start = y * width
+            first = diff.find( 0xFF , start , start + width )
+            if first < 0: continue
+            left  = min( left  , first - start )
+            right = max( right , diff.rfind( 0xFF , start , start + width ) - start + 1 )
+        return ( left , top , right - left , bottom - top )
+
+    def __dirty__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                (x,y,w,h) or None. Rectangle that must be grown again. None when
+                the whole frame must be grown.
+        """
+        changes = self.changes()
+        if changes is None: return None
+        x , y , w , h = changes
+        if not w or not h: return changes
+
+        left   = max( 0 , x - thickness )
+        top    = max( 0 , y - thickness )
+        right  = min( self.width  , x + w + thickness )
+        bottom = min( self.height , y + h + thickness )
+        if (right - left) * (bottom - top) > PATCH_RATIO * self.size:
+            return None
+        return ( left , top , right - left , bottom - top )
+
+    def __initial__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                bytearray. Previous result with the dirty rectangle reset, or
+                the current frame when the previous result can't be used.
+        """
+        dirty       = self.__dirty__( thickness )
+        self._dirty = dirty
+        if dirty is None:
+            return super().__initial__( thickness )
+
+        self.patched += 1
+        x , y , w , h = dirty
+        initial = bytearray( self.previous[1] )
+        if w and h:
+            paste( initial , self.width , crop( self.data , self.width , x , y , w , h ).translate( ALPHA ) , x , y , w , h )
+        return initial
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                [(x,y,w,h)]. The dirty rectangle, or the whole frame.
+        """
+        dirty = self._dirty
+        if dirty is None:
+            return super().__regions__( thickness )
+        return [ dirty ] if dirty[2] and dirty[3] else []
+
+class BandGrow( RegionGrow ):
+    """
+        Splits the frame into horizontal bands. Each band is read with a halo
+        of [thickness] rows above and below it, grown on its own, and only
+        its interior is written into the output. The result of the whole
+        frame is never kept: the output of unlift_data, difference_with and
+        xor_with is made band by band, so besides the input and the output,
+        the memory used only depends on the size of a band.
+    """
+    def __init__( self , data , width , size , engine = None , bandHeight = BAND_HEIGHT ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each band.
+                bandHeight(int):    minimal number of rows of each band.
+        """
+        self.bandHeight = bandHeight
+        super().__init__( data , width , size , engine )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None , engine = None , bandHeight = BAND_HEIGHT ):
+        """ RETURNS
+                Trivial BandGrow object. """
+        return cls( bytearray() , 0 , 0 , engine , bandHeight )
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                [(x,y,w,h)]. The bands of the frame.
+        """
+        width  = self.width
+        height = self.height
+        # Big halos are expensive compared with small bands:
+        band   = max( self.bandHeight , 2 * thickness , 1 )
+        return [ ( 0 , y , width , min( band , height - y ) ) for y in range( 0 , height , band ) ]
+
+    def __stream__( self , combine ):
+        """
+            ARGUMENTS
+                combine( function(bytearray,int,int) -> bytes ):
+                    Takes the grown pixels of a band (0x00/0xFF) and the range of
+                    the band in the frame [start,end), and returns the output of
+                    the band.
+            RETURNS
+                bytearray. The output of every band.
+        """
+        size   = self.size
+        width  = self.width
+        output = bytearray( size )
+        grow   = bool( self.steps ) and self.hasFrontier()
+        self.regions = 0
+        if not size: return output
+
+        thickness = self.thickness()
+        for x , y , w , h in self.__regions__( thickness ):
+            start = y * width
+            end   = start + h * width
+            band  = self.__grow_window__( x , y , w , h , thickness ) if grow else None
+            if band is None:
+                band = self.data[ start : end ].translate( ALPHA )
+            output[ start : end ] = combine( band , start , end )
+        return output
+
+    def unlift_data( self ):
+        """ RETURNS
+                bytearray
+            Returns a new bytearray with the opaque pixels marked as 0xFF. """
+        return self.__stream__( lambda band , start , end: band )
+
+    def difference_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply difference with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies difference operation while
+            between the internal and external alpha data.
+        """
+        def difference( band , start , end ):
+            return ( int.from_bytes( band , "little" ) &
+                     ~int.from_bytes( external[ start : end ] , "little" ) ).to_bytes( end - start , "little" )
+        return self.__stream__( difference )
+
+    def xor_with( self , external ):
+        """
+            ARGUMENTS
+                external(bytearray): external to apply xor with it.
+            RETURNS
+                bytearray
+            SEE ALSO
+                unlift_data
+            Similar to unlift_data, but applies xor before return the new
+            bytearray object.
+            """
+        def xor( band , start , end ):
+            return ( int.from_bytes( band , "little" ) ^
+                     int.from_bytes( external[ start : end ] , "little" ) ).to_bytes( end - start , "little" )
+        return self.__stream__( xor )
+
+class ComponentGrow( RegionGrow ):
+    """
+        Labels the connected components of the frame (see components) and
+        expands their boxes by the thickness, so each box holds every pixel
+        that its component can reach. The boxes that overlap are merged into
+        groups until none of them overlap.
+
+        A pixel of a group is never closer than [thickness] pixels to the
+        opaque pixels of another group (otherwise, their boxes would overlap),
+        so each group is grown on its own, without any halo: the work done
+        depends on the area of the blobs and their margins instead of the
+        area of their union.
+    """
+    def __init__( self , data , width , size , engine = None ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each group.
+        """
+        self.blobs = 0  # Int: Number of connected components of the last result.
+        super().__init__( data , width , size , engine )
+
+    def __halo__( self , thickness ):
+        """ RETURNS
+                int. The groups don't need any halo. """
+        return 0
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                [(x,y,w,h)]. A box per group of components. The boxes don't overlap.
+        """
+        width  = self.width
+        height = self.height
+        blobs  = components( self.data , width , height )
+        boxes  = [ [ max( 0 , x0 - thickness ) , max( 0 , y0 - thickness ) ,
+                     min( width , x1 + thickness ) , min( height , y1 + thickness ) ]
+                   for x0 , y0 , x1 , y1 in blobs ]
+        self.blobs = len( blobs )
+
+        # Sweep along the columns, merging the overlapping boxes until it's stable:
+        merged = True
+        while merged:
+            merged = False
+            active = []     # Groups that can overlap the next boxes.
+            groups = []
+            for box in sorted( boxes ):
+                active = [ group for group in active if group[2] > box[0] ]
+                for group in active:
+                    if group[1] < box[3] and box[1] < group[3]:
+                        group[1] = min( group[1] , box[1] )
+                        group[2] = max( group[2] , box[2] )
+                        group[3] = max( group[3] , box[3] )
+                        merged   = True
+                        break
+                else:
+                    active.append( box )
+                    groups.append( box )
+            boxes = groups
+        return [ ( x0 , y0 , x1 - x0 , y1 - y0 ) for x0 , y0 , x1 , y1 in boxes ]
@@ -18,6 +18,19 @@
     DEPTHS      :: dict
         Holds relevant information about color depths supported by Krita.
 
+    thresholdTable :: func( number , number , int , int ) -> bytes
+        Translation table that maps the bytes in a range into 0x00/0xFF values.
+
+    FLOATS      :: dict
+        Size, bit pattern of the infinity and sign bit of the float depths.
+
+    TILE_HEIGHT :: int
+        Default number of rows read from the projection of a node at once.
+
+    The alpha channel is extracted in bulk: with NumPy, the pixel data of each
+    tile is read in place; without it, the channel is tested with byte tables
+    over each of its bytes. The pixels are never read one by one.
+
     [*] Author
      |- Gaps : sGaps : ArtGaps
 """
@@ -25,19 +38,44 @@
 
 from PyQt5.QtCore  import QRect
 from struct        import pack , unpack
+from math          import ceil , floor
+from sys           import byteorder
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 DEPTHS = { "U8"  : "B" ,    # unsigned char
            "U16" : "H" ,    # unsigned short
            "F16" : "e" ,    # half float
            "F32" : "f" }    # float
 
+TILE_HEIGHT = 64
+
+FLOATS = { "e" : ( 2 , 0x7c00     , 0x8000     ) ,
+           "f" : ( 4 , 0x7f800000 , 0x80000000 ) }
+
+def thresholdTable( low , high , inside = 0x00 , outside = 0xff ):
+    """
+        ARGUMENTS
+            low , high(number): range of values (both inclusive).
+            inside(int):        value of the bytes in the range.
+            outside(int):       value of the other bytes.
+        RETURNS
+            bytes. Translation table (see bytes.translate) of 256 elements.
+    """
+    return bytes( inside if low <= value <= high else outside for value in range(256) )
+
 class Scrapper( object ):
     """ Utility class to extract the alpha channel from a Krita's Node. """
     TRANSPARENT = 0x00
     OPAQUE      = 0xff
-    def __init__( self ):
-        """ Defined only for compatibility purposes. """
-        pass
+    def __init__( self , tileHeight = TILE_HEIGHT ):
+        """
+            ARGUMENTS
+                tileHeight(int): number of rows read from the projection at once. """
+        self.tileHeight = tileHeight
 
     def extractRelevantAlpha( self , node , extra_pixels = 0 , transparent = 0 , threshold = 0 ):
         """
@@ -68,7 +106,8 @@ class Scrapper( object ):
                                             nbounds.width() ,
                                             nbounds.height(),
                                             transparent     ,
-                                            threshold       ) , nbounds )
+                                            threshold       ,
+                                            self.tileHeight ) , nbounds )
 
     def extractAlpha( self , node , bounds , transparent = 0 , threshold = 0 ):
         """
@@ -91,10 +130,11 @@ class Scrapper( object ):
                                            bounds.width()  ,
                                            bounds.height() ,
                                            transparent     ,
-                                           threshold       )
+                                           threshold       ,
+                                           self.tileHeight )
 
     @classmethod
-    def __extract_alpha__( cls , node , x , y , w , h , transparent = 0 , threshold = 0 ):
+    def __extract_alpha__( cls , node , x , y , w , h , transparent = 0 , threshold = 0 , tile = TILE_HEIGHT ):
         """
             ARGUMENTS
                 node (krita.Node):          The source node.
@@ -104,6 +144,7 @@ class Scrapper( object ):
                 h(int):                     height of the node's bound.
                 transparent(number):        The value which is considered as transparent.
                 threshold(number):          The range of values that the class will consider as transparent.
+                tile(int):                  number of rows read from the projection at once.
             RETURNS
                 bytearray
 
@@ -111,9 +152,6 @@ class Scrapper( object ):
             the sizes w and h (width and height).
             """
         # Extract the channel data:
-        wopaque      = Scrapper.OPAQUE
-        wtransparent = Scrapper.TRANSPARENT
-
         chans = node.channels()
         if chans:
             nmChn  = len( chans )
@@ -122,30 +160,185 @@ class Scrapper( object ):
             nmChn = 1                       # 1 channel
             szChn = 1                       # 1 byte
 
-        # Retrive the projection Information: (THIS ALLOWS GROUP LAYERS SUPPORT)
-        pxldata = bytes( node.projectionPixelData( x , y , w , h ) )
         pattern = DEPTHS[node.colorDepth()]
         low    = transparent - threshold
         high   = transparent + threshold
 
-        if pattern == DEPTHS["F16"]:
-            # Special traits:
-            offset = (nmChn - 1) * szChn
-            step   = nmChn * szChn
-            length = len(pxldata)
-            tsize  = 2
-            reader = memoryview( pxldata ).cast( 'B' )
-            # NOTE: this reads the values as Float16 using the built-in interface ```struct.unpack```,
-            #       because this had some troubles when tries to read them using the memoryview.cast( 'e' )
-            return bytearray( wtransparent if low <= unpack( pattern , reader[i:i+tsize] )[0] <= high else
-                              wopaque      for i in range(offset,length,step) )
+        # The projection is read by tiles of rows, and the alpha of each tile is written
+        # into the output, so the whole pixel data is never held at once.
+        tile   = max( 1 , tile )
+        output = bytearray( w * h )
+        for top in range( 0 , h , tile ):
+            rows  = min( tile , h - top )
+            start = top * w
+            # Retrive the projection Information: (THIS ALLOWS GROUP LAYERS SUPPORT)
+            pxldata = node.projectionPixelData( x , y + top , w , rows )
+            output[ start : start + rows * w ] = Scrapper.__threshold__( pxldata , pattern , nmChn , szChn , low , high )
+            del pxldata
+        return output
+
+    @staticmethod
+    def __threshold__( pxldata , pattern , nmChn , szChn , low , high ):
+        """
+            ARGUMENTS
+                pxldata(QByteArray or bytes):   pixel data with [nmChn] channels per pixel.
+                pattern(str):                   format of each channel (see DEPTHS).
+                nmChn(int):                     number of channels.
+                szChn(int):                     size of each channel.
+                low , high(number):             range of transparent values (both inclusive).
+            RETURNS
+                bytes-like object. 0x00 for the transparent pixels and 0xFF for the opaque ones.
+        """
+        if pattern in FLOATS:
+            least , most = low , high
         else:
-            offset = nmChn - 1
-            step   = nmChn
-            reader = memoryview( pxldata ).cast( pattern )
-            length = len( reader )
-            return bytearray( wtransparent if low <= reader[i] <= high else
-                              wopaque      for i in range(offset,length,step) )
+            least = max( 0                      , ceil( low )   )
+            most  = min( (1 << (8 * szChn)) - 1 , floor( high ) )
+
+        with memoryview( pxldata ) as view:
+            if np is not None:
+                # The pixel data is read in place. The floats are compared as Python
+                # floats (float64), as in the per pixel version.
+                values = np.frombuffer( view , dtype = pattern )[nmChn - 1::nmChn]
+                if least > most:
+                    return bytes( [Scrapper.OPAQUE] ) * len( values )
+                if pattern in FLOATS:
+                    values = values.astype( np.float64 )
+                inside = (least <= values) & (values <= most)
+                del values
+                return np.where( inside , np.uint8(Scrapper.TRANSPARENT) , np.uint8(Scrapper.OPAQUE) ).data
+            pxldata = bytes( view )
+
+        if pattern == DEPTHS["U8"]:
+            # The alpha channel is sliced at once (slicing bytes is faster than slicing
+            # a memoryview), and each value is mapped by a table:
+            return pxldata[nmChn - 1::nmChn].translate( thresholdTable( low , high ) )
+        if pattern in FLOATS:
+            ranges = Scrapper.__float_ranges__( pattern , low , high )
+        else:
+            ranges = [ (least , most) ] if least <= most else []
+        return Scrapper.__threshold_lanes__( pxldata , nmChn , szChn , ranges )
+
+    @staticmethod
+    def __float_ranges__( pattern , low , high ):
+        """
+            ARGUMENTS
+                pattern(str):       "e" (F16) or "f" (F32).
+                low , high(number): range of transparent values (both inclusive).
+            RETURNS
+                [(int,int)]. Ranges (both inclusive) of the bit patterns of the floats
+                in [low,high].
+
+            The floats with the same sign are ordered as their bit patterns (without
+            the sign bit), from 0 to the infinity. So the positive and the negative
+            floats in [low,high] are two ranges of patterns, found by a binary search.
+            The NaNs are never in a range, as in the comparisons of Python. """
+        size , infinity , sign = FLOATS[pattern]
+        decode = lambda bits: unpack( "<" + pattern , bits.to_bytes( size , "little" ) )[0]
+
+        def search( a , b ):
+            # Smallest magnitude with a value >= a:
+            first , last = 0 , infinity + 1
+            while first < last:
+                middle = (first + last) // 2
+                if decode( middle ) >= a: last  = middle
+                else:                     first = middle + 1
+            start = first
+            # Biggest magnitude with a value <= b:
+            first , last = -1 , infinity
+            while first < last:
+                middle = (first + last + 1) // 2
+                if decode( middle ) <= b: first = middle
+                else:                     last  = middle - 1
+            return ( start , first ) if start <= first else None
+
+        ranges   = []
+        positive = search(  low  ,  high )
+        negative = search( -high , -low  )
+        if positive: ranges.append( positive )
+        if negative: ranges.append( ( sign | negative[0] , sign | negative[1] ) )
+        return ranges
+
+    @staticmethod
+    def __test__( lane , a , b ):
+        """ RETURNS
+                int. Big integer with 0xFF on the bytes of the lane in [a,b] and 0x00 on the other ones. """
+        return int.from_bytes( lane.translate( thresholdTable( a , b , 0xff , 0x00 ) ) , "little" )
+
+    @staticmethod
+    def __bound__( lanes , digits , greater ):
+        """
+            ARGUMENTS
+                lanes([bytes]):     bytes of the values, from the most significant one.
+                digits(bytes):      bytes of the bound, from the most significant one.
+                greater(bool):      compares with >= (or with <= when it's False).
+            RETURNS
+                int or None. Big integer with 0xFF on the values that are on the right side
+                of the bound. None when all of them are. """
+        edge = 0x00 if greater else 0xff
+        if all( digit == edge for digit in digits ): return None
+        lane , digit = lanes[0] , digits[0]
+        rest = Scrapper.__bound__( lanes[1:] , digits[1:] , greater ) if len( lanes ) > 1 else None
+        if rest is None:
+            return Scrapper.__test__( lane , digit , 0xff ) if greater else Scrapper.__test__( lane , 0x00 , digit )
+        strict = Scrapper.__test__( lane , digit + 1 , 0xff ) if greater else Scrapper.__test__( lane , 0x00 , digit - 1 )
+        return strict | ( Scrapper.__test__( lane , digit , digit ) & rest )
+
+    @staticmethod
+    def __inside__( lanes , least , most ):
+        """
+            ARGUMENTS
+                lanes([bytes]):     bytes of the values, from the most significant one.
+                least , most(bytes):bytes of the limits, from the most significant one.
+            RETURNS
+                int or None. Big integer with 0xFF on the values in [least,most]. None when
+                all of them are.
+
+            A value is in the range when its first byte is strictly between the first
+            bytes of the limits, or when it's equal to the first byte of a limit and
+            the other bytes are on the right side of that limit. """
+        if all( d == 0x00 for d in least ) and all( d == 0xff for d in most ): return None
+        lane , a , b = lanes[0] , least[0] , most[0]
+        if len( lanes ) == 1:
+            return Scrapper.__test__( lane , a , b )
+        if a == b:
+            rest  = Scrapper.__inside__( lanes[1:] , least[1:] , most[1:] )
+            equal = Scrapper.__test__( lane , a , a )
+            return equal if rest is None else equal & rest
+
+        lower  = Scrapper.__bound__( lanes[1:] , least[1:] , True  )
+        upper  = Scrapper.__bound__( lanes[1:] , most[1:]  , False )
+        # The limits that cover all the other bytes don't need their own test:
+        inside = Scrapper.__test__( lane , a + (lower is not None) , b - (upper is not None) )
+        if lower is not None: inside |= Scrapper.__test__( lane , a , a ) & lower
+        if upper is not None: inside |= Scrapper.__test__( lane , b , b ) & upper
+        return inside
+
+    @staticmethod
+    def __threshold_lanes__( pxldata , nmChn , szChn , ranges ):
+        """
+            ARGUMENTS
+                pxldata(bytes):         pixel data with [nmChn] channels of [szChn] bytes per pixel.
+                nmChn(int):             number of channels.
+                szChn(int):             size of each channel.
+                ranges([(int,int)]):    ranges of the transparent values, read as unsigned
+                                        integers (both inclusive).
+            RETURNS
+                bytearray. 0x00 for the transparent pixels and 0xFF for the opaque ones.
+
+            Each byte of the alpha channel is sliced apart (a lane), and the ranges are
+            tested with byte tables over the lanes, joined as big integers. """
+        step   = szChn * nmChn
+        offset = szChn * (nmChn - 1)
+        order  = range( szChn - 1 , -1 , -1 ) if byteorder == "little" else range( szChn )
+        lanes  = [ pxldata[ offset + index :: step ] for index in order ]
+        count  = len( lanes[0] )
+        full   = (1 << (8 * count)) - 1
+        inside = 0
+        for least , most in ranges:
+            mask    = Scrapper.__inside__( lanes , least.to_bytes( szChn , "big" ) , most.to_bytes( szChn , "big" ) )
+            inside |= full if mask is None else mask
+        return bytearray( (full ^ inside).to_bytes( count , "little" ) )
 
     def channelSize( self , node ):
         """ Returns the channel size of the channels inside the node. """
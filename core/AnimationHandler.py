@@ -66,6 +66,7 @@ class AnimationHandler( object ):
         self.exportdir   = exportdirpath
         self.exportReady = len(exportdirpath) > 0
         self.exported    = []
+        self.aliases     = {}   # { alias : file_basename }: Frames that reuse an exported file.
 
         # Debug:
         self.debug = (lambda msg : print( msg , file = stderr )) if debug else (lambda msg: None)
@@ -86,6 +87,32 @@ class AnimationHandler( object ):
                 the current files exported by this object """
         return self.exported
 
+    def get_imported_file_basenames( self ):
+        """
+            RETURNS
+                the exported file base names and their aliases. """
+        return self.exported + list( self.aliases )
+
+    @staticmethod
+    def frame_basename( time , timeline ):
+        """
+            ARGUMENTS
+                time(int):          frame number.
+                timeline(range):    animation range (None when there isn't any animation).
+            RETURNS
+                str. File base name used to export the frame at [time]. """
+        digits = len( str( len( timeline or [None] ) ) )
+        return f"frame{time:0{digits}}.png"
+
+    def alias( self , file_basename , source_basename ):
+        """
+            ARGUMENTS
+                file_basename(str):     base name of a frame that won't be exported.
+                source_basename(str):   base name of an exported frame with the same content.
+            Makes the frame file_basename use the file of source_basename when the frames
+            are imported. Aliases aren't files, so they're never removed by clean_up_all. """
+        self.aliases[file_basename] = self.aliases.get( source_basename , source_basename )
+
     @staticmethod
     def basicInfoObject():
         """
@@ -285,8 +312,9 @@ class AnimationHandler( object ):
             return False
 
         searchpath  = self.exportdir
+        aliases     = self.aliases
         frame_names = file_basenames.copy()
         frame_names.sort()
-        frame_names = [ f"{searchpath}/{frame}" for frame in frame_names ]
+        frame_names = [ f"{searchpath}/{aliases.get(frame,frame)}" for frame in frame_names ]
         return AnimationHandler.import_frames( self.doc , startframe , frame_names )
 
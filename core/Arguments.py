@@ -16,7 +16,10 @@
         border layer.
 
     METHODS     :: dict
-        Holds all grow methods currently available with their names.
+        Holds all grow methods currently available with their names. The steps of
+        the shaped methods (square, octagon and disc) are the radius of the shape.
+        The bitmap shapes (see Shapes) aren't listed: they're only available
+        through the Python API (shape_grow of each engine).
 
     COLOR_TYPES :: set
         Holds the supported color types by a Border object.
@@ -46,6 +49,19 @@
                                where start, end are Ints
             "name":         New border's name.
 
+        Optional keys:
+            "cache-size":   Int. Size cap (in bytes) of the border cache. It's disabled
+                            when it's 0. Uses Cache.DEFAULT_CAPACITY by default.
+            "blobs":        Bool. Grows the big and sparse frames by groups of blobs
+                            instead of tiles (see AlphaGrowRegions.ComponentGrow).
+                            False by default.
+            "frame-cache-size":
+                            Int. Size cap (in bytes) of the frames kept for the next
+                            runs in the same Krita session. It's disabled when it's 0.
+                            Uses FrameCache.DEFAULT_FRAME_CAPACITY by default.
+            "tile-height":  Int. Number of rows read from the projection of the node at
+                            once. Uses AlphaScrapper.TILE_HEIGHT by default.
+
     DEPTHS          :: dict
         Holds relevant information about the color Depth, like cast string and
         max values.
@@ -65,8 +81,12 @@ except:
 
 # Critical custom modules
 from .AlphaGrow     import Grow
-from .AlphaScrapper import Scrapper
+from .AlphaScrapper import Scrapper , TILE_HEIGHT
 from .AnimationHandler import AnimationHandler
+from .Recipe        import compileRecipe , showPlan
+from .Cache         import DEFAULT_CAPACITY
+from .FrameCache    import SESSION , DEFAULT_FRAME_CAPACITY
+from .EngineSelector import EngineSelector
 from .Service       import Service , Client
 
 METHODS = { "force"             : Grow.force_grow             ,
@@ -74,7 +94,10 @@ METHODS = { "force"             : Grow.force_grow             ,
             "corners"           : Grow.corners_grow           ,
             "not-corners"       : Grow.not_corners_grow       ,
             "strict-horizontal" : Grow.strict_horizontal_grow ,
-            "strict-vertical"   : Grow.strict_vertical_grow   }
+            "strict-vertical"   : Grow.strict_vertical_grow   ,
+            "square"            : Grow.square_grow            ,
+            "octagon"           : Grow.octagon_grow           ,
+            "disc"              : Grow.disc_grow              }
 
 COLOR_TYPES = { "FG" , "BG" , "CS" }
 # Keys used in the data structure passed by the GUI
@@ -224,7 +247,18 @@ class KisData( object ):
         report( f"transparency:     {self.transparency}" )
         report( f"threshold:        {self.threshold}" )
         report( f"recipe:           {self.recipe}" )
+        report( f"compiled plan:    {showPlan(self.plan)}" )
         report( f"thickness:        {self.thickness}" )
+        report( f"cache size:       {self.cacheSize}" )
+        report( f"blobs:            {self.blobs}" )
+        report( f"frame cache:      {self.frameCache.stats() if self.frameCache else None}" )
+        if self.selector.calibrated():
+            bounds = self.node.bounds()
+            engine , reason = self.selector.explain( bounds.width() * bounds.height() , None , self.plan )
+            report( f"engine:           {reason}" )
+            report( f"calibration:      {self.selector.path} ({'loaded' if self.selector.loaded else 'measured'})" )
+        else:
+            report( f"engine:           not calibrated ({self.selector.path})" )
         report( f"batchmode Krita:  {self.batchK}" )
         report( f"batchmode Doc.:   {self.batchD}" )
         report( f"channels:         {self.channels}" )
@@ -233,6 +267,7 @@ class KisData( object ):
         report( f"Parent Node:      {self.parent}" )
         report( f"Take Bounds From: {self.constraint}" )
         report( f"Scrapper:         {self.scrapper}" )
+        report( f"tile height:      {self.scrapper.tileHeight}" )
         report( f"Start Time:       {self.start}" )
         report( f"Finish Time:      {self.finish}" )
         report( f"Timeline Range:   {self.timeline}" )
@@ -310,6 +345,12 @@ class KisData( object ):
         primRecipe      = data["q-recipedsc"] if data["is-quick"] else data["c-recipedsc"]
         self.recipe     = [ KisData.pairToMethod(desc) for desc in primRecipe ]
         self.thickness  = sum( map(lambda tupl: tupl[1] , self.recipe) )
+        self.plan       = compileRecipe( self.recipe )
+        self.cacheSize  = data.get( "cache-size" , DEFAULT_CAPACITY )
+        self.blobs      = bool( data.get( "blobs" , False ) )
+        self.frameCacheSize = data.get( "frame-cache-size" , DEFAULT_FRAME_CAPACITY )
+        self.frameCache     = SESSION if self.frameCacheSize else None
+        self.selector   = EngineSelector( debug = self.debug )
 
         # [<] Rollback state:
         self.batchK , self.batchD = self.kis.batchmode() , self.kis.batchmode()
@@ -323,7 +364,7 @@ class KisData( object ):
         self.parent   = self.node.parentNode()
 
         # [&] Abstract Objects:
-        self.scrapper     = Scrapper()
+        self.scrapper     = Scrapper( data.get( "tile-height" , TILE_HEIGHT ) )
         self.animHandler = AnimationHandler( self.doc , debug = False )
 
         # [/] Timeline:
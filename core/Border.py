@@ -20,14 +20,21 @@
 """
 # Plugin's Realm:
 from .Reader    import Reader
-from .Generator import Generator
+from .Generator import Generator , ProcessGenerator
 from .Writer    import Writer
 from .KisStatus import KisStatus
 from .Arguments import KisData
 from .Service   import Client
+from .AnimationHandler import AnimationHandler
+from .Cache     import BorderCache
+from .FrameCache import SESSION
+from .Parallel  import processContext
+from .Scheduler import schedule , balance
 # Python's Realm:
 from threading  import Thread , Barrier
 from queue      import SimpleQueue
+from hashlib    import blake2b
+import os
 
 # Debugging/Profiling:
 import cProfile
@@ -142,6 +149,34 @@ class Border( object ):
         """ Verify if the target layers has been deleted. """
         return self.targetsDeleted
 
+    @staticmethod
+    def deduplicate( raw_alphas ):
+        """
+            ARGUMENTS
+                raw_alphas(SimpleQueue<ALPHA>): frames read from the source node.
+            RETURNS
+                ( SimpleQueue<ALPHA> , { int : int } ). The unique frames, and the time of
+                each duplicated frame mapped to the time of its unique frame.
+            Two frames are the same when they have the same bounds and alpha data. The
+            frames are compared only when the hashes of their data and bounds match. """
+        unique  = SimpleQueue()
+        seen    = {}    # { ( hash , bounds ) : [ALPHA] }
+        aliases = {}
+        while not raw_alphas.empty():
+            frame  = raw_alphas.get_nowait()
+            bounds = frame.bounds
+            key    = ( blake2b( frame.alpha , digest_size = 16 ).digest() ,
+                       bounds.x() , bounds.y() , bounds.width() , bounds.height() )
+            candidates = seen.setdefault( key , [] )
+            for other in candidates:
+                if other.alpha == frame.alpha:
+                    aliases[frame.time] = other.time
+                    break
+            else:
+                candidates.append( frame )
+                unique.put( frame )
+        return unique , aliases
+
     def run( self ):
         """ Performs all actions on normal or debug mode. """
         if not self.args:
@@ -190,6 +225,9 @@ class Border( object ):
         batchK , batchD = args.batchK , args.batchD
         client          = Client( args.service )
 
+        # The size cap of the session cache is only applied when a run starts:
+        SESSION.resize( args.frameCacheSize )
+
         report( "Setup batch mode" )
         kis.setBatchmode( True )
         doc.setBatchmode( True )
@@ -214,8 +252,17 @@ class Border( object ):
         # |> ROLLBACK >-----------------------------------------------------
 
         if not args.timeline:
-            # It isn't necessary use several threads in this case.
+            # It isn't necessary use several threads in this case. But the frame can
+            # be split between several processes:
             nWorkers      = 1
+            nProcesses    = os.cpu_count() or 1
+            pooled        = False
+        else:
+            # The frames are grown in worker processes when it's possible, because
+            # the Generator threads share the GIL:
+            nProcesses    = os.cpu_count() or 1
+            pooled        = nframes > 1 and nProcesses > 1 and processContext() is not None
+            nProcesses    = nProcesses if pooled else 1
 
         # Step 1: Fetch the alpha channel data of each frame.
         # -------   <*>TAGS:    ROLLBACK (current time),
@@ -233,6 +280,18 @@ class Border( object ):
                          progress )
         reader.run()
 
+        # Same frames are grown and exported only once:
+        raw_alphas , duplicates = Border.deduplicate( raw_alphas )
+        if duplicates:
+            report( f"Deduplicated frames: {len(duplicates)}" )
+            # Their Generator and Writer steps are already done:
+            for _ in range( (ITER_STEPS - 1) * len(duplicates) ):
+                stepDone()
+
+        # The most expensive frames are grown first, so the workers finish together,
+        # and the consecutive frames with the same size are grown by the same worker:
+        raw_alphas = schedule( raw_alphas , args.plan , nProcesses if pooled else nWorkers )
+
         # Step 2: Apply the grow recipe to each alpha data:
         # -------   <*>TAGS:    NO-ROLLBACK,
         #                       PARALLEL
@@ -240,15 +299,20 @@ class Border( object ):
         stepName( "Alpha Frames:" )
         frameNumber( 0 )
         grow_alphas = SimpleQueue()
-        generators  = [ Generator( args,
-                               raw_alphas,
-                               grow_alphas,
-                               status,
-                               report,
-                               status.internalStopRequest,
-                               progress ) for _ in range(nWorkers) ]
-        tgenerators = [ Thread( target = generators[i].run , name = f"generator-{i}" )
-                        for i in range(nWorkers)        ]
+        cache       = BorderCache( capacity = args.cacheSize , debug = args.debug ) if args.cacheSize else None
+        kind        = ProcessGenerator if pooled else Generator
+        generators  = [ kind( args,
+                              raw_alphas,
+                              grow_alphas,
+                              status,
+                              report,
+                              status.internalStopRequest,
+                              progress,
+                              cache     = cache ,
+                              processes = nProcesses ,
+                              selector  = args.selector ) for _ in range(1 if pooled else nWorkers) ]
+        tgenerators = [ Thread( target = generator.run , name = f"generator-{i}" )
+                        for i , generator in enumerate(generators) ]
         for tg in tgenerators:
             tg.start()
         report( "Making Borders" )
@@ -256,8 +320,14 @@ class Border( object ):
         for tg in tgenerators:
             tg.join()
 
+        loads = {}
+        for generator in generators:
+            loads.update( generator.load )
+        report( f"Generator balance: {balance(loads)}" )
+
         del generators
         del tgenerators
+        if cache: report( f"Border cache: {cache.stats()}" )
 
         # Makes a new directory for the animation frames when it's possible.
         report( "Making temporary directory for animation" )
@@ -327,12 +397,15 @@ class Border( object ):
         stepName( "" )
         frameErase()
         report( "Importing Borders" )
+        frame_basename = AnimationHandler.frame_basename
+        for time , source in duplicates.items():
+            animator.alias( frame_basename( time , args.timeline ) , frame_basename( source , args.timeline ) )
         # NOTE: There's a weird message which is shown by krita. ($N is a number)
         #           >>> krita.general: DEBUG: releasing of the pooled memory has been cancelled: there are still $N tiles in memory
         #       Maybe it's a bug on Krita's import routine or something similar.
         #       It also happens when I import and animations and export image on
         #       Krita (even When I don't use this plugin).
-        if not client.serviceRequest( animator.import_by_basename , args.start , animator.get_exported_file_basenames() ):
+        if not client.serviceRequest( animator.import_by_basename , args.start , animator.get_imported_file_basenames() ):
             report( "Cannot import animation frames" )
             status.internalStopRequest( "[core.Borderizer]: UNABLE TO IMPORT ANIMATION FRAMES." )
         else:
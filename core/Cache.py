@@ -0,0 +1,214 @@
+# Module:   core.Cache.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# --------------------------------------------
+"""
+    Persistent cache of the borders made by a Generator. A border only depends
+    on the alpha data of the frame, the size of its bounds and the compiled
+    recipe, so these are used as the key of each entry.
+
+    [:] Defined in this module
+    --------------------------
+    BorderCache         :: class
+        Stores compressed borders in a directory and removes the least
+        recently used ones when the directory exceeds its capacity.
+
+    cacheLocation       :: func( str ) -> str
+        Path of a file or directory inside the cache folder of the user.
+
+    CACHE_DIRECTORY     :: str
+        Default directory of the cache (see cacheLocation).
+
+    DEFAULT_CAPACITY    :: int
+        Default size cap (in bytes) of the cache directory.
+
+    EXTENSION           :: str
+        Extension of the files of the entries.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .Recipe    import showPlan
+from threading  import Lock
+from hashlib    import blake2b
+from sys        import stderr
+import os
+import zlib
+
+try:
+    from PyQt5.QtCore import QStandardPaths
+except ImportError:
+    QStandardPaths = None
+
+PLUGIN_DIRECTORY = os.path.dirname( os.path.dirname( os.path.abspath(__file__) ) )
+
+def cacheLocation( name ):
+    """
+        ARGUMENTS
+            name(str): name of a file or directory.
+        RETURNS
+            str. Path of [name] inside the cache folder of the user (see
+            QStandardPaths.CacheLocation), because the folder of the plugin may be
+            read-only. Uses the folder of the plugin when there isn't any writable
+            cache folder.
+    """
+    folder = ""
+    if QStandardPaths is not None:
+        folder = QStandardPaths.writableLocation( QStandardPaths.CacheLocation )
+    if folder:
+        folder = os.path.join( folder , "pixel-borders" )
+        try:
+            os.makedirs( folder , exist_ok = True )
+        except OSError:
+            folder = ""
+    if not folder or not os.access( folder , os.W_OK ):
+        folder = PLUGIN_DIRECTORY
+    return os.path.join( folder , name )
+
+CACHE_DIRECTORY  = cacheLocation( "cache" )
+DEFAULT_CAPACITY = 64 << 20
+EXTENSION        = ".z"
+
+class BorderCache( object ):
+    """
+        A BorderCache object keeps one file per border. Each file holds the
+        border compressed with zlib, and its modification time is updated
+        every time it's read, so the oldest files are the least recently used.
+
+        It's shared by several Generator threads, so every operation is
+        done under a lock. Errors of the file system are never raised:
+        they're counted as misses.
+    """
+    def __init__( self , directory = CACHE_DIRECTORY , capacity = DEFAULT_CAPACITY , debug = False ):
+        """
+            ARGUMENTS
+                directory(str): where the entries are stored.
+                capacity(int):  maximum number of bytes used by the entries.
+                debug(bool):    prints errors on stderr.
+        """
+        self.directory = directory
+        self.capacity  = capacity
+        self.mutex     = Lock()
+        self.debug     = (lambda msg : print( msg , file = stderr )) if debug else (lambda msg: None)
+
+        # Statistics:
+        self.hits      = 0  # Int: Number of borders found.
+        self.misses    = 0  # Int: Number of borders not found.
+        self.evictions = 0  # Int: Number of entries removed.
+        self.used      = 0  # Int: Number of bytes used by the entries.
+        self.ready     = False
+
+        try:
+            os.makedirs( directory , exist_ok = True )
+            self.used  = sum( size for _ , _ , size in self.__entries__() )
+            self.ready = True
+        except OSError as err:
+            self.debug( f"[core.Cache]: Unable to use {directory} ; err = {err.args}" )
+            self.ready = False
+
+    @staticmethod
+    def key( alpha , width , height , plan ):
+        """
+            ARGUMENTS
+                alpha(bytearray):       alpha data of the frame.
+                width , height(int):    size of the bounds of the frame.
+                plan([Recipe.STEP]):    compiled recipe.
+            RETURNS
+                str. Key of the border of the frame.
+        """
+        digest = blake2b( alpha , digest_size = 20 )
+        digest.update( f"|{width}x{height}|{showPlan(plan)}".encode( "utf-8" ) )
+        return digest.hexdigest()
+
+    def __entry_path__( self , key ):
+        """ RETURNS
+                str. File path of an entry. """
+        return os.path.join( self.directory , key + EXTENSION )
+
+    def __entries__( self ):
+        """ RETURNS
+                [(float,str,int)]. Modification time, path and size of each entry. """
+        entries = []
+        for entry in os.scandir( self.directory ):
+            if entry.name.endswith( EXTENSION ) and entry.is_file():
+                stat = entry.stat()
+                entries.append( ( stat.st_mtime , entry.path , stat.st_size ) )
+        return entries
+
+    def get( self , key ):
+        """
+            ARGUMENTS
+                key(str): key made by BorderCache.key.
+            RETURNS
+                bytearray or None. The border stored with that key.
+        """
+        if not self.ready: return None
+        path = self.__entry_path__( key )
+        with self.mutex:
+            try:
+                with open( path , "rb" ) as handle:
+                    border = bytearray( zlib.decompress( handle.read() ) )
+                os.utime( path )    # Most recently used.
+                self.hits += 1
+                return border
+            except ( OSError , zlib.error ):
+                self.misses += 1
+                return None
+
+    def put( self , key , border ):
+        """
+            ARGUMENTS
+                key(str):           key made by BorderCache.key.
+                border(bytearray):  border to store.
+            Stores a border and removes the least recently used entries when the
+            capacity is exceeded.
+        """
+        if not self.ready: return
+        path      = self.__entry_path__( key )
+        temporary = f"{path}.{os.getpid()}.tmp"
+        data      = zlib.compress( bytes(border) , 1 )
+        if len( data ) > self.capacity: return
+
+        with self.mutex:
+            try:
+                # Writes a temporary file first, so a broken entry is never read.
+                with open( temporary , "wb" ) as handle:
+                    handle.write( data )
+                previous = os.path.getsize( path ) if os.path.exists( path ) else 0
+                os.replace( temporary , path )
+                self.used += len( data ) - previous
+            except OSError as err:
+                self.debug( f"[core.Cache]: Unable to write {path} ; err = {err.args}" )
+                return
+
+            if self.used > self.capacity:
+                self.__evict__()
+
+    def __evict__( self ):
+        """
+            Removes the least recently used entries until the cache fits in its capacity.
+            Must be called under the lock.
+        """
+        try:
+            entries = self.__entries__()
+        except OSError:
+            return
+        entries.sort()
+        used = sum( size for _ , _ , size in entries )
+        for _ , path , size in entries:
+            if used <= self.capacity: break
+            try:
+                os.remove( path )
+                used           -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self.used = used
+
+    def stats( self ):
+        """ RETURNS
+                str. Readable statistics of the cache. """
+        lookups = self.hits + self.misses
+        ratio   = 100 * self.hits / lookups if lookups else 0
+        return ( f"hits = {self.hits} , misses = {self.misses} ({ratio:.1f}% hits) , " +
+                 f"evictions = {self.evictions} , used = {self.used} / {self.capacity} bytes" )
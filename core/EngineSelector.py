@@ -0,0 +1,242 @@
+# Module:   core.EngineSelector.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -----------------------------------------------------
+"""
+    Chooses the fastest Grow engine for each frame. None of the engines is
+    the fastest for every frame: the cost of AlphaGrow.Grow depends on the
+    perimeter of the shapes, while the bitboard and array engines depend on
+    the area of the frame, and each one has a different setup cost.
+
+    The first time, a short benchmark grows a few frames with each engine
+    and stores the timings in a calibration file (in the cache folder of the
+    user, see Cache.cacheLocation).
+    Then, the cost of a frame is estimated from the closest calibrated frame
+    (by area and opaque ratio) and the steps of the compiled recipe.
+
+    [:] Defined in this module
+    --------------------------
+    EngineSelector      :: class
+        Calibrates the engines and chooses one per frame.
+
+    CALIBRATION_FILE    :: str
+        Default path of the calibration file (see Cache.cacheLocation).
+
+    CALIBRATION_SIDES   :: (int)
+    CALIBRATION_RATIOS  :: (float)
+        Size (side of a square frame) and opaque ratio of the frames used by
+        the benchmark.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .Engines   import ENGINES , ENGINE
+from .Recipe    import STEP , runPlan
+from .Shapes    import reach
+from .Cache     import cacheLocation
+from threading  import Lock
+from random     import Random
+from sys        import stderr , version_info
+from time       import perf_counter
+from math       import log
+import json
+
+CALIBRATION_FILE   = cacheLocation( "calibration.json" )
+CALIBRATION_SIDES  = ( 32 , 128 )
+CALIBRATION_RATIOS = ( 0.05 , 0.5 )
+VERSION            = 1
+
+# Kinds of steps measured by the benchmark. The plan of each kind, and the amount
+# of work that it represents (see EngineSelector.__amount__):
+KINDS = { "step"    : ( [ STEP( "any_neighbor_grow" , ()            , 1 ) ] , 1 ) ,
+          "policy"  : ( [ STEP( "corners_grow"      , ()            , 1 ) ] , 1 ) ,
+          "diamond" : ( [ STEP( "diamond_grow"      , (8,)          , 1 ) ] , 8 ) ,
+          "shape"   : ( [ STEP( "shape_grow"        , ("disc" , 4)  , 1 ) ] , 4 ) }
+NEIGHBOR_KERNELS = { "any_neighbor_grow" , "force_grow" }
+
+class EngineSelector( object ):
+    """
+        An EngineSelector object keeps the timings of each engine, as
+        { engine : { cell : { kind : seconds } } }, where a cell is a
+        calibrated frame ("<side>x<ratio>") and kind is "setup" (reading the
+        frame and writing its border) or one of the kinds of steps.
+
+        The benchmark is made the first time that an engine is chosen (not when
+        the object is built), and only once: it's shared by the Generator threads.
+    """
+    def __init__( self , path = CALIBRATION_FILE , engines = None , debug = False ):
+        """
+            ARGUMENTS
+                path(str):                  calibration file.
+                engines({ str : class }):   engines that can be chosen. Uses Engines.ENGINES when it's None.
+                debug(bool):                prints errors on stderr.
+        """
+        self.path    = path
+        self.engines = engines or ENGINES
+        self.timings = None     # { str : { str : { str : float } } }: None until it's calibrated.
+        self.loaded  = False    # Bool: the timings were read from the calibration file.
+        self.mutex   = Lock()
+        self.debug   = (lambda msg : print( msg , file = stderr )) if debug else (lambda msg: None)
+
+    def __load__( self ):
+        """ RETURNS
+                dict or None. Timings of the calibration file, when they were made by this
+                version of the benchmark, on this Python version, for the same engines. """
+        try:
+            with open( self.path , "r" ) as handle:
+                data = json.load( handle )
+        except Exception as err:
+            self.debug( f"[core.EngineSelector]: Unable to read {self.path} ; err = {err.args}" )
+            return None
+        if ( data.get( "version" ) != VERSION or data.get( "python" ) != list( version_info[:2] ) or
+             set( data.get( "timings" , {} ) ) != set( self.engines ) ):
+            return None
+        return data["timings"]
+
+    def __save__( self ):
+        """ Writes the timings into the calibration file. """
+        data = { "version" : VERSION , "python" : list( version_info[:2] ) , "timings" : self.timings }
+        try:
+            with open( self.path , "w" ) as handle:
+                json.dump( data , handle , indent = 4 )
+        except Exception as err:
+            self.debug( f"[core.EngineSelector]: Unable to save {self.path} ; err = {err.args}" )
+
+    @staticmethod
+    def __frame__( side , ratio ):
+        """ RETURNS
+                bytearray. Square frame with random 4x4 blobs, with about [ratio] opaque pixels. """
+        random = Random( side )
+        frame  = bytearray( side * side )
+        for _ in range( int( side * side * ratio / 16 ) + 1 ):
+            x , y = random.randrange( side ) , random.randrange( side )
+            for row in range( y , min( side , y + 4 ) ):
+                frame[ row * side + x : row * side + min( side , x + 4 ) ] = b"\xff" * (min( side , x + 4 ) - x)
+        return frame
+
+    @staticmethod
+    def __time__( engine , frame , side , plan , repeat = 3 ):
+        """ RETURNS
+                float. Best time (in seconds) of growing the frame with the plan. """
+        best = float( "inf" )
+        for _ in range( repeat ):
+            start = perf_counter()
+            grow  = engine.singleton()
+            grow.setData( frame , side , len( frame ) )
+            runPlan( grow , plan )
+            grow.difference_with( frame )
+            best  = min( best , perf_counter() - start )
+        return best
+
+    def calibrate( self ):
+        """
+            RETURNS
+                { str : { str : { str : float } } }. The timings of the benchmark.
+            Runs the benchmark and saves its timings.
+        """
+        timings = {}
+        for name , engine in self.engines.items():
+            cells = timings[name] = {}
+            for side in CALIBRATION_SIDES:
+                for ratio in CALIBRATION_RATIOS:
+                    frame = EngineSelector.__frame__( side , ratio )
+                    cell  = cells[ f"{side}x{ratio}" ] = {}
+                    cell["setup"] = EngineSelector.__time__( engine , frame , side , [] )
+                    for kind , ( plan , _ ) in KINDS.items():
+                        timed      = EngineSelector.__time__( engine , frame , side , plan )
+                        cell[kind] = max( 0.0 , timed - cell["setup"] )
+        self.timings = timings
+        self.__save__()
+        return timings
+
+    def calibrated( self ):
+        """ RETURNS
+                bool. True when the timings are known. They're read from the calibration
+                file when it's possible, but the benchmark is never made here. """
+        with self.mutex:
+            if self.timings is None:
+                self.timings = self.__load__()
+                self.loaded  = self.timings is not None
+            return self.timings is not None
+
+    def ready( self ):
+        """ RETURNS
+                { str : { str : { str : float } } }. The timings, loaded or calibrated
+                the first time. """
+        with self.mutex:
+            if self.timings is None:
+                self.timings = self.__load__()
+                self.loaded  = self.timings is not None
+                if self.timings is None:
+                    self.calibrate()
+            return self.timings
+
+    @staticmethod
+    def __amount__( plan ):
+        """ RETURNS
+                { str : float }. Work of each kind of step in the plan, measured in
+                benchmark steps. """
+        amount = dict.fromkeys( KINDS , 0.0 )
+        for kernel , args , times in plan:
+            if kernel == "diamond_grow":
+                kind , work = "diamond" , args[0]
+            elif kernel == "shape_grow":
+                kind , work = "shape" , reach( *args )
+            elif kernel in NEIGHBOR_KERNELS:
+                kind , work = "step" , 1
+            else:
+                kind , work = "policy" , 1
+            amount[kind] += times * work / KINDS[kind][1]
+        return amount
+
+    def estimate( self , area , ratio , plan ):
+        """
+            ARGUMENTS
+                area(int):              number of pixels of the frame.
+                ratio(float or None):   fraction of opaque pixels. None when it's unknown
+                                        (every calibrated ratio is averaged).
+                plan([Recipe.STEP]):    compiled recipe.
+            RETURNS
+                { str : float }. Estimated time (in seconds) of each engine.
+        """
+        timings = self.ready()
+        side    = min( CALIBRATION_SIDES , key = lambda s: abs( log( max( 1 , area ) / (s * s) ) ) )
+        ratios  = CALIBRATION_RATIOS if ratio is None else [ min( CALIBRATION_RATIOS , key = lambda r: abs( r - ratio ) ) ]
+        scale   = area / (side * side)
+        amount  = EngineSelector.__amount__( plan )
+
+        estimates = {}
+        for name , cells in timings.items():
+            total = 0.0
+            for r in ratios:
+                cell   = cells[ f"{side}x{r}" ]
+                total += cell["setup"] + sum( cell[kind] * work for kind , work in amount.items() )
+            estimates[name] = scale * total / len( ratios )
+        return estimates
+
+    def explain( self , area , ratio , plan ):
+        """
+            ARGUMENTS
+                see estimate.
+            RETURNS
+                ( class , str ). The fastest engine, and the reason of the choice.
+        """
+        estimates = self.estimate( area , ratio , plan )
+        if not estimates:
+            return ( ENGINE , f"{ENGINE.__name__} (default: nothing calibrated)" )
+        ranking = sorted( estimates.items() , key = lambda item: item[1] )
+        name    = ranking[0][0]
+        opaque  = "unknown" if ratio is None else f"{100 * ratio:.0f}%"
+        others  = " , ".join( f"{other} {1000 * time:.2f} ms" for other , time in ranking[1:] )
+        return ( self.engines[name] ,
+                 f"{name} (estimated {1000 * ranking[0][1]:.2f} ms ; {others}) " +
+                 f"for {area} pixels , {opaque} opaque" )
+
+    def choose( self , area , ratio , plan ):
+        """
+            ARGUMENTS
+                see estimate.
+            RETURNS
+                class. The fastest engine for the frame.
+        """
+        return self.explain( area , ratio , plan )[0]
@@ -0,0 +1,36 @@
+# Module:   core.Engines.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# ----------------------------------------------
+"""
+    Holds the Grow engines that can be used to make the borders.
+
+    [:] Defined in this module
+    --------------------------
+    ENGINE  :: class
+        Default Grow engine. It's the NumPy based engine when NumPy can be
+        imported, the bitboard engine otherwise.
+
+    ENGINES :: { str : class }
+        Available Grow engines, by name (see EngineSelector).
+
+    BatchGrow :: class or None
+        Engine that grows a stack of frames with the same size at once (see
+        AlphaGrowBatch). It's None when NumPy can't be imported.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .AlphaGrow     import Grow
+from .AlphaGrowBits import BitGrow
+
+try:
+    from .AlphaGrowNumpy import NumpyGrow
+    from .AlphaGrowBatch import BatchGrow
+    ENGINE = NumpyGrow
+except ImportError:
+    NumpyGrow = None
+    BatchGrow = None
+    ENGINE    = BitGrow
+
+ENGINES = { engine.__name__ : engine for engine in ( Grow , BitGrow , NumpyGrow ) if engine is not None }
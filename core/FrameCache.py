@@ -0,0 +1,177 @@
+# Module:   core.FrameCache.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -------------------------------------------------
+"""
+    In-memory cache of the alpha data read from a Krita's Node. It lives
+    as long as the plugin stays loaded (the whole Krita session), so the
+    runs that only change the recipe or the color don't read the frames
+    from the document again.
+
+    The entries are checked with a fingerprint of the nodes that only reads
+    a few lines of pixels (see Reader.fingerprint). So a change of the nodes
+    that falls between the sampled lines, and that doesn't change their
+    bounds, isn't noticed: the frame read before that change is reused.
+    The modified state of the document isn't used, because the run itself
+    changes it (it adds the border layer).
+
+    [:] Defined in this module
+    --------------------------
+    FrameCache              :: class
+        Keeps the content of the frames read by a Reader and removes the
+        least recently used ones when they exceed its capacity.
+
+    SNAPSHOT                :: namedtuple( QRect , QRect , QRect , bytearray , bytes )
+        Content of a frame and the state of the document when it was read.
+
+    SESSION                 :: FrameCache
+        Cache shared by every run of the plugin.
+
+    DEFAULT_FRAME_CAPACITY  :: int
+        Default size cap (in bytes) of the cache.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from collections import namedtuple , OrderedDict
+from threading   import Lock
+
+DEFAULT_FRAME_CAPACITY = 256 << 20
+
+class SNAPSHOT(
+    namedtuple(
+        typename    = 'SNAPSHOT',
+        field_names = ['read','nodeBounds','content','alpha','fingerprint']
+              )
+           ):
+    """
+        read(QRect):            bounds of the alpha data that was read.
+        nodeBounds(QRect):      bounds of the node that constrains the frame, at its time.
+        content(QRect or None): tight bounds of the opaque pixels (None when there isn't any).
+        alpha(bytearray):       alpha data inside the content bounds.
+        fingerprint(bytes):     digest of the nodes (see Reader.fingerprint).
+    """
+    pass
+
+class FrameCache( object ):
+    """
+        A FrameCache object maps a frame of a node (and the transparency
+        used to read it) to a SNAPSHOT. The entries are kept in the order
+        of their last use, and each one costs the size of its alpha data.
+
+        An entry is dropped when it's found with another fingerprint of the
+        nodes.
+    """
+    def __init__( self , capacity = DEFAULT_FRAME_CAPACITY ):
+        """
+            ARGUMENTS
+                capacity(int):  maximum number of bytes used by the entries.
+        """
+        self.capacity = capacity
+        self.entries  = OrderedDict()   # { key : SNAPSHOT }: from the least recently used.
+        self.mutex    = Lock()
+
+        # Statistics:
+        self.hits          = 0  # Int: Number of frames found.
+        self.misses        = 0  # Int: Number of frames not found.
+        self.invalidations = 0  # Int: Number of entries dropped because the nodes changed.
+        self.evictions     = 0  # Int: Number of entries removed to fit in the capacity.
+        self.used          = 0  # Int: Number of bytes used by the entries.
+
+    @staticmethod
+    def key( doc , source , constraint , time , transparency , threshold ):
+        """
+            ARGUMENTS
+                doc(krita.Document):        document of the nodes.
+                source(krita.Node):         node whose alpha is read.
+                constraint(krita.Node):     node that gives the bounds of the frame.
+                time(int):                  time of the frame.
+                transparency(number):       transparent value.
+                threshold(number):          threshold of the transparent value.
+            RETURNS
+                tuple. Key of the frame.
+        """
+        return ( doc.fileName() , source.uniqueId().toString() , constraint.uniqueId().toString() ,
+                 time , transparency , threshold )
+
+    def get( self , key , fingerprint ):
+        """
+            ARGUMENTS
+                key(tuple):         key made by FrameCache.key.
+                fingerprint( function(SNAPSHOT) -> bytes or None ):
+                                    current fingerprint of the nodes, in the area of the
+                                    stored frame. It's only called when there's an entry.
+            RETURNS
+                SNAPSHOT or None. The frame stored with that key.
+        """
+        with self.mutex:
+            snapshot = self.entries.get( key )
+            if snapshot is None:
+                self.misses += 1
+                return None
+
+        # The nodes are read outside the lock:
+        valid = snapshot.fingerprint == fingerprint( snapshot )
+        with self.mutex:
+            if not valid:
+                if self.entries.get( key ) is snapshot:
+                    self.__drop__( key )
+                self.invalidations += 1
+                self.misses        += 1
+                return None
+            if key in self.entries:
+                self.entries.move_to_end( key )     # Most recently used.
+            self.hits += 1
+            return snapshot
+
+    def put( self , key , snapshot ):
+        """
+            ARGUMENTS
+                key(tuple):         key made by FrameCache.key.
+                snapshot(SNAPSHOT): frame to store.
+            Stores a frame and removes the least recently used entries when the
+            capacity is exceeded.
+        """
+        size = len( snapshot.alpha )
+        if size > self.capacity: return
+        with self.mutex:
+            if key in self.entries:
+                self.__drop__( key )
+            self.entries[key] = snapshot
+            self.used        += size
+            while self.used > self.capacity:
+                self.__drop__( next( iter( self.entries ) ) )
+                self.evictions += 1
+
+    def __drop__( self , key ):
+        """ Removes an entry. Must be called under the lock. """
+        self.used -= len( self.entries.pop( key ).alpha )
+
+    def resize( self , capacity ):
+        """
+            ARGUMENTS
+                capacity(int):  new maximum number of bytes used by the entries.
+            Removes the least recently used entries that don't fit (all of them
+            when the capacity is 0). """
+        with self.mutex:
+            self.capacity = capacity
+            while self.used > capacity:
+                self.__drop__( next( iter( self.entries ) ) )
+                self.evictions += 1
+
+    def clear( self ):
+        """ Removes all the entries. """
+        with self.mutex:
+            self.entries.clear()
+            self.used = 0
+
+    def stats( self ):
+        """ RETURNS
+                str. Readable statistics of the cache. """
+        lookups = self.hits + self.misses
+        ratio   = 100 * self.hits / lookups if lookups else 0
+        return ( f"hits = {self.hits} , misses = {self.misses} ({ratio:.1f}% hits) , " +
+                 f"invalidations = {self.invalidations} , evictions = {self.evictions} , " +
+                 f"used = {self.used} / {self.capacity} bytes" )
+
+SESSION = FrameCache()
@@ -13,26 +13,84 @@
         + Notify errors or events occurred in the process.
         + Modifies the status of the program when something goes wrong.
 
+    ProcessGenerator:: class
+        Generator that grows the frames in a pool of worker processes.
+
+    TILED_AREA      :: int
+    TILED_DENSITY   :: float
+        Frames with at least TILED_AREA pixels and less than TILED_DENSITY
+        opaque pixels are grown by tiles (see AlphaGrowRegions.TileGrow), or
+        by groups of blobs when KisData.blobs is on (see
+        AlphaGrowRegions.ComponentGrow and Parallel.ParallelComponentGrow).
+
+    BANDED_AREA     :: int
+        The other frames with at least BANDED_AREA pixels are grown by bands
+        (see AlphaGrowRegions.BandGrow), so they never need a whole frame of
+        grow state.
+
+    When the Generator has more than one process, the other frames with at
+    least Parallel.PARALLEL_AREA pixels are grown by bands in worker
+    processes (see Parallel.ParallelGrow).
+
+    On incremental mode, the other frames are grown by patching the result
+    of the previous frame with the same shape (see AlphaGrowRegions.PatchGrow).
+    The engine used on these frames is chosen by an EngineSelector, when the
+    Generator has one and no engine was given.
+
+    BATCH_AREA      :: int
+    BATCH_SIZE      :: int
+        Frames with at most BATCH_AREA pixels are gathered by size, and grown
+        in batches of up to BATCH_SIZE frames (see AlphaGrowBatch.BatchGrow),
+        when NumPy is available.
+
     [*] Author
      |- Gaps : sGaps : ArtGaps
 """
 from .Arguments import KisData
 from .KisStatus import KisStatus , ALPHA
-from .AlphaGrow import Grow
+from .Recipe    import runPlan , planSteps
+from .Scheduler import frameCost
+from .Engines   import ENGINE , BatchGrow
+from .AlphaGrowRegions import TileGrow , PatchGrow , BandGrow , ComponentGrow
+from .Parallel  import ParallelGrow , ParallelComponentGrow , PARALLEL_AREA , SHARED_AREA , SharedMemory
+from .Parallel  import processContext , picklable , sharedPool , collect , _grow_frames
+from collections import deque
+from threading  import current_thread
 from queue      import SimpleQueue
 
+TILED_AREA    = 1 << 20
+TILED_DENSITY = 0.05
+BANDED_AREA   = 1 << 26
+BATCH_AREA    = 1 << 16
+BATCH_SIZE    = 64
+
 
 class Generator( object ):
     """ Make borders for an alpha data. """ 
     def __init__( self , kis_arguments  = KisData()          ,
-                         inQueue        = SimpleQueue()      ,
+                         inQueue        = SimpleQueue()      , # Units of frames (see Scheduler.schedule).
                          outQueue       = SimpleQueue()      ,
                          status         = KisStatus()        ,
                          report         = (lambda msg: None) ,
                          error          = (lambda msg: None) ,
-                         stepDone       = (lambda:     None) ): # 'Atomic' Increment
+                         stepDone       = (lambda:     None) , # 'Atomic' Increment
+                         engine         = None               , # Grow engine (class). Uses Engines.ENGINE when it's None.
+                         incremental    = True               , # Reuse the result of the previous frame.
+                         cache          = None               , # Cache.BorderCache shared by the generators.
+                         processes      = 1                  , # Worker processes used on each big frame.
+                         batchSize      = BATCH_SIZE         , # Max. small frames grown at once (0 or 1: never).
+                         selector       = None               ): # EngineSelector that chooses the engine of each frame.
         super().__init__()
-        self.args   = kis_arguments
+        self.args        = kis_arguments
+        self.engine      = engine or ENGINE
+        self.selector    = selector if engine is None else None
+        self.incremental = incremental
+        self.cache       = cache
+        self.processes   = processes
+        self.batchSize   = batchSize if BatchGrow is not None else 0
+        self.load        = {}   # { str : [int,int] }: frames and cost grown by each worker (see Scheduler.balance).
+        self.chosen      = {}   # { str : int }: frames grown with each engine chosen by the selector.
+        self.patched     = 0    # Int: frames made from the previous one by the workers (see ProcessGenerator).
         # In/Out
         self.raw  = inQueue
         self.done = outQueue
@@ -44,29 +102,90 @@ class Generator( object ):
         self.stepDone = stepDone
 
     @staticmethod
-    def runRecipe( grow , recipe ):
+    def runRecipe( grow , plan ):
         """
             ARGUMENTS
-                grow(AlphaGrow.Grow):               Grow object.
-                recipe([AlphaGrow.Grow.method()):   describes how to make border grow
+                grow(AlphaGrow.Grow):   Grow object (or any other Grow engine).
+                plan([Recipe.STEP]):    compiled recipe. Describes how to make border grow
             RETURNS
                 AlphaGrow.Grow
-            Apply the grow recipe to the grow object. """
-        [
-            [ task(grow) for i in range(steps) ]    # Apply a grow-task as many steps required.
-            for task , steps in recipe              # Take a task and how many steps will be applied from the recipe.
-        ]
-        return grow
-
-    # IO (queue<ALPHA>) -> IO (queue<ALPHA>)
+            Apply the compiled grow recipe to the grow object. """
+        return runPlan( grow , plan )
+
+    @staticmethod
+    def isSparse( alpha , length ):
+        """
+            ARGUMENTS
+                alpha(bytearray):   alpha data.
+                length(int):        number of pixels of the frame.
+            RETURNS
+                bool. True when the frame must be grown by tiles: it's big and
+                has a few opaque pixels. """
+        return length >= TILED_AREA and length - alpha.count( 0 , 0 , length ) < TILED_DENSITY * length
+
+    def __choose__( self , alpha , length ):
+        """
+            ARGUMENTS
+                alpha(bytearray):   alpha data.
+                length(int):        number of pixels of the frame.
+            RETURNS
+                class. Engine used to grow the whole frame: the one chosen by the
+                selector, or the engine of the Generator. """
+        if not self.selector or not length:
+            return self.engine
+        ratio  = 1 - alpha.count( 0 , 0 , length ) / length
+        engine = self.selector.choose( length , ratio , self.args.plan )
+        self.chosen[ engine.__name__ ] = self.chosen.get( engine.__name__ , 0 ) + 1
+        return engine
+
+    def __account__( self , falpha , worker = None ):
+        """
+            ARGUMENTS
+                falpha(ALPHA):  frame grown.
+                worker(str):    name of the worker that grew it. Uses the name of
+                                the current thread when it's None.
+            Adds the frame to the load of the worker. """
+        load     = self.load.setdefault( worker or current_thread().name , [0,0] )
+        load[0] += 1
+        load[1] += frameCost( falpha , planSteps( self.args.plan ) )
+
+    def __send__( self , falpha , border ):
+        """
+            ARGUMENTS
+                falpha(ALPHA):      source frame.
+                border(bytearray):  border of the frame.
+            Sends the border to the next stage. """
+        self.done.put(
+            ALPHA(border,
+                  falpha.time,
+                  falpha.bounds)
+                )
+
+        # [*] PROGRESS BAR:
+        self.stepDone()
+
+    def __frames__( self ):
+        """
+            YIELDS
+                ALPHA. The frames of each unit taken from the input queue (see
+                Scheduler.schedule), one unit after another, until it's empty. """
+        while True:
+            try:
+                # Exit when it's empty:
+                unit = self.raw.get_nowait()
+            except:
+                return
+            yield from unit
+
+    # IO (queue<[ALPHA]>) -> IO (queue<ALPHA>)
     def run( self ):
         """
             Make borders using the source node's alpha data.
         """
-        raw    = self.raw
         done   = self.done
         status = self.status
-        recipe = self.args.recipe
+        recipe = self.args.plan
+        cache  = self.cache
 
         # I/O Reports ------------
         report   = self.report
@@ -74,18 +193,21 @@ class Generator( object ):
         stepDone = self.stepDone
 
         runRecipe  = Generator.runRecipe
-        grow       = Grow.singleton()
+        grows      = {}     # { class : Grow }: Grow objects used on the whole frames, by engine.
+        tiled      = TileGrow.singleton( engine = self.engine )
+        blobs      = ComponentGrow.singleton( engine = self.engine )
+        pblobs     = ParallelComponentGrow.singleton( engine = self.engine , processes = self.processes ) if self.processes > 1 else None
+        useBlobs   = getattr( self.args , "blobs" , False )
+        banded     = BandGrow.singleton( engine = self.engine )
+        parallel   = ParallelGrow.singleton( engine = self.engine , processes = self.processes ) if self.processes > 1 else None
+        batch      = BatchGrow.singleton() if self.batchSize > 1 else None
+        pending    = {}     # { (width,height) : [(ALPHA,str)] }: small frames waiting for a batch.
 
-        while True:
+        for falpha in self.__frames__():
             if not status.keepRunning():
                 report( "core.Generate: Canceled by user." )
                 break
-            try:
-                # Exit when it's empty:
-                falpha = raw.get_nowait()
-            except:
-                break
-            
+
             alpha  = falpha.alpha
             time   = falpha.time
             bounds = falpha.bounds
@@ -95,18 +217,259 @@ class Generator( object ):
             length = width * bounds.height()
             # ---------------------------------------
 
+            # [C] Cached Border ---------------------
+            key    = cache.key( alpha , width , bounds.height() , recipe ) if cache else None
+            border = cache.get( key ) if cache else None
+            # ---------------------------------------
+
+            # [S] Small Frame -----------------------
+            if border is None and batch and 0 < length <= BATCH_AREA:
+                shape  = ( width , bounds.height() )
+                frames = pending.setdefault( shape , [] )
+                frames.append( ( falpha , key ) )
+                if len( frames ) >= self.batchSize:
+                    self.__grow_batch__( batch , pending.pop( shape ) )
+                continue
+            # ---------------------------------------
+
             # [G] Generate Border -------------------
-            grow.setData( alpha , width , length )
-            runRecipe( grow , recipe )
+            if border is None:
+                # Big and sparse frames are grown by tiles, and huge frames by bands:
+                if Generator.isSparse( alpha , length ):
+                    if not useBlobs:
+                        engine = tiled
+                    elif pblobs and length >= PARALLEL_AREA:
+                        engine = pblobs
+                    else:
+                        engine = blobs
+                elif parallel and length >= PARALLEL_AREA:
+                    engine = parallel
+                elif length >= BANDED_AREA:
+                    engine = banded
+                else:
+                    kind   = self.__choose__( alpha , length )
+                    engine = grows.get( kind )
+                    if engine is None:
+                        engine = grows[kind] = PatchGrow.singleton( engine = kind ) if self.incremental else kind.singleton()
+                engine.setData( alpha , width , length )
+                runRecipe( engine , recipe )
+                border = engine.difference_with( alpha )
+                if cache: cache.put( key , border )
+                self.__account__( falpha )
             # ---------------------------------------
-            
-            done.put(
-                ALPHA(grow.difference_with( alpha ),
-                      time,
-                      bounds)
-                    )
-
-            # [*] PROGRESS BAR:
-            stepDone()
+
+            self.__send__( falpha , border )
+
+        # [R] Remaining Batches -----------------
+        for frames in pending.values():
+            if not status.keepRunning(): break
+            self.__grow_batch__( batch , frames )
+        # ---------------------------------------
+
         # All done.
+        patched = sum( getattr( grow , "patched" , 0 ) for grow in grows.values() )
+        if patched:
+            report( f"core.Generate: {patched} frames made from the previous one." )
+        if self.chosen:
+            report( f"core.Generate: Engines chosen by the selector: {self.chosen}" )
+        if batch and batch.batches:
+            report( f"core.Generate: {batch.frames} small frames grown in {batch.batches} batches." )
+        if getattr( self.args , "debug" , False ):
+            # Memory kept by the Grow objects (the region engines keep an inner one):
+            for engine in ( *grows.values() , tiled , banded ):
+                inner = getattr( engine , "inner" , engine )
+                if hasattr( inner , "memory" ):
+                    report( f"core.Generate: {type(engine).__name__} buffers: {inner.memory()} bytes." )
+
+    def __grow_batch__( self , batch , frames ):
+        """
+            ARGUMENTS
+                batch(AlphaGrowBatch.BatchGrow):    engine used on the whole batch.
+                frames([(ALPHA,str)]):              frames with the same bounds size, and
+                                                    their cache keys.
+            Makes the borders of every frame at once, and sends them as the
+            single frames are sent. """
+        cache  = self.cache
+        first  = frames[0][0].bounds
+        alphas = [ falpha.alpha for falpha , _ in frames ]
+
+        batch.setFrames( alphas , first.width() , first.height() )
+        Generator.runRecipe( batch , self.args.plan )
+        borders = batch.difference_with( alphas )
+        batch.setFrames( [] , 0 , 0 )   # Releases the stack.
+
+        for ( falpha , key ) , border in zip( frames , borders ):
+            if cache: cache.put( key , border )
+            self.__account__( falpha )
+            self.__send__( falpha , border )
+
+
+class ProcessGenerator( Generator ):
+    """
+        Make borders for an alpha data in a pool of worker processes.
+
+        The threads of a Generator share the GIL, so several of them grow no
+        faster than one. A ProcessGenerator sends each frame to a pool of
+        [processes] workers instead (see Parallel._grow_frames): the big frames
+        through shared memory, the small ones pickled. Each unit of frames (see
+        Scheduler.schedule) is grown by a single worker. Each worker keeps its
+        own Grow objects, and the cache is used by this process only.
+
+        The workers are the ones of Parallel.sharedPool, so they're started
+        only once per session.
+
+        It works as a single Generator (in its own thread) when the workers
+        can't be used: there's a single process, no Python interpreter can
+        start them (see Parallel.processContext), the recipe can't be pickled
+        (custom policies made with lambdas) or they don't start in time (see
+        Parallel.startPool; then the later runs don't try again). When a worker
+        exits in the middle of a frame, the frames on the way are grown that way
+        too (see Parallel.collect).
+    """
+    # IO (queue<[ALPHA]>) -> IO (queue<ALPHA>)
+    def run( self ):
+        """
+            Make borders using the source node's alpha data.
+        """
+        context = processContext() if self.processes > 1 else None
+        if context is None or not picklable( ( self.engine , self.args.plan ) ):
+            return super().run()
+
+        pool = sharedPool( self.processes )
+        if pool is None:
+            self.report( "core.Generate: Unable to start the worker processes. Using a single process." )
+            return super().run()
+
+        self.report( f"core.Generate: Growing frames in {self.processes} worker processes." )
+        try:
+            self.__pool_run__( pool )
+        except ChildProcessError as err:
+            self.report( f"core.Generate: {err} Growing the remaining frames in a single process." )
+            super().run()
+        if self.patched:
+            self.report( f"core.Generate: {self.patched} frames made from the previous one by the workers." )
+
+    def __pool_run__( self , pool ):
+        """
+            ARGUMENTS
+                pool(multiprocessing.pool.Pool): workers that grow the frames.
+            Sends each unit of frames to a worker (see Scheduler.schedule), keeping
+            up to two units per worker on the way, and sends the borders in the
+            order they're received. """
+        raw    = self.raw
+        status = self.status
+        recipe = self.args.plan
+        cache  = self.cache
+        report = self.report
+        limit  = 2 * self.processes
+        flight = deque()    # [([(ALPHA,str,SharedMemory,SharedMemory)],AsyncResult)]
+
+        try:
+            while True:
+                if not status.keepRunning():
+                    report( "core.Generate: Canceled by user." )
+                    break
+                try:
+                    unit = raw.get_nowait()
+                except:
+                    unit = None
+
+                if unit is not None:
+                    frames = []     # [(ALPHA,str)]: frames of the unit that must be grown.
+                    for falpha in unit:
+                        bounds = falpha.bounds
+                        key    = cache.key( falpha.alpha , bounds.width() , bounds.height() , recipe ) if cache else None
+                        border = cache.get( key ) if cache else None
+                        if border is None and not bounds.width() * bounds.height():
+                            border = bytearray()
+                        if border is not None:
+                            self.__send__( falpha , border )
+                        else:
+                            frames.append( ( falpha , key ) )
+                    if not frames:
+                        continue
+
+                    flight.append( self.__submit__( pool , frames ) )
+                    if len( flight ) < limit:
+                        continue
+                elif not flight:
+                    break   # All done.
+
+                entry = flight.popleft()
+                try:
+                    self.__collect__( pool , *entry )
+                except ChildProcessError:
+                    # The frames on the way are grown again by the caller:
+                    for frames , _ in ( entry , *flight ):
+                        raw.put( [ falpha for falpha , *_ in frames ] )
+                    raise
+        finally:
+            for frames , _ in flight:
+                for *_ , source , target in frames:
+                    ProcessGenerator.__release__( source , target )
+
+    def __submit__( self , pool , frames ):
+        """
+            ARGUMENTS
+                pool(multiprocessing.pool.Pool): workers that grow the frames.
+                frames([(ALPHA,str)]):           frames of a unit, and their cache keys.
+            RETURNS
+                ([(ALPHA,str,SharedMemory,SharedMemory)],AsyncResult). Unit on the way.
+        """
+        sparse = TileGrow if not getattr( self.args , "blobs" , False ) else ComponentGrow
+        jobs   = []
+        blocks = []
+        for falpha , key in frames:
+            alpha  = falpha.alpha
+            width  = falpha.bounds.width()
+            length = width * falpha.bounds.height()
+            region = sparse if Generator.isSparse( alpha , length ) else BandGrow if length >= BANDED_AREA else None
+            source = target = None
+            if SharedMemory is not None and length >= SHARED_AREA:
+                source = SharedMemory( create = True , size = length )
+                target = SharedMemory( create = True , size = length )
+                source.buf[ :length ] = alpha[ :length ]
+                data , output = source.name , target.name
+            else:
+                data , output = bytes( alpha[ :length ] ) , None
+            blocks.append( ( falpha , key , source , target ) )
+
+            engine = self.__choose__( alpha , length ) if region is None else self.engine
+            jobs.append( ( region , engine , self.incremental , self.args.plan , data , output , width , length ) )
+        return ( blocks , pool.apply_async( _grow_frames , ( jobs , ) ) )
 
+    def __collect__( self , pool , frames , result ):
+        """
+            ARGUMENTS
+                pool(multiprocessing.pool.Pool): workers that grow the frames.
+                see the result of __submit__.
+            Waits for the borders of a unit, and sends them. Raises ChildProcessError
+            when a worker exits before its task is done (see Parallel.collect). """
+        try:
+            values = collect( pool , result )
+            borders = []
+            for ( falpha , _ , _ , target ) , ( pid , value , patched ) in zip( frames , values ):
+                length = falpha.bounds.width() * falpha.bounds.height()
+                borders.append( bytearray( target.buf[ :length ] ) if value is True else value )
+                self.patched += patched
+        except ChildProcessError:
+            raise
+        except Exception as err:
+            self.error( f"[core.Generator]: A worker process failed ; err = {err!r}" )
+            return
+        finally:
+            for *_ , source , target in frames:
+                ProcessGenerator.__release__( source , target )
+
+        for ( falpha , key , _ , _ ) , border in zip( frames , borders ):
+            if self.cache: self.cache.put( key , border )
+            self.__account__( falpha , f"process-{pid}" )
+            self.__send__( falpha , border )
+
+    @staticmethod
+    def __release__( *blocks ):
+        """ Closes and removes the shared memory blocks. """
+        for shared in blocks:
+            if shared is not None:
+                shared.close()
+                shared.unlink()
@@ -0,0 +1,558 @@
+# Module:   core.Parallel.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -----------------------------------------------
+"""
+    Grows the frames in several worker processes, so the grow stage can use
+    more than one core: Grow is pure Python, so the threads share the GIL.
+    A single big frame is split into bands (see ParallelGrow) or into groups
+    of blobs (see ParallelComponentGrow), and the frames of an animation are
+    grown at the same time (see _grow_frames, used by Generator.ProcessGenerator).
+
+    The workers are always started with "spawn". When Python is embedded into
+    another program (like Krita), sys.executable isn't a Python interpreter,
+    so a Python interpreter that can import this plugin (with the same version
+    and the same sys.path) is searched and used to start the workers (see
+    findPython).
+
+    The frame is shared with the workers through shared memory (Python 3.8+).
+    Each worker reads the band with its halo, grows it and writes the band's
+    interior into a shared output, so the bands are never pickled. On older
+    versions, each band is sent to the workers and its interior is returned.
+
+    [:] Defined in this module
+    --------------------------
+    ParallelGrow    :: class
+        BandGrow that grows its bands in worker processes.
+
+    ParallelComponentGrow :: class
+        ComponentGrow that grows its groups of blobs in worker processes.
+
+    findPython      :: func() -> str or None
+        Python interpreter that can start the workers.
+
+    processContext  :: func() -> multiprocessing.context or None
+        Context used to start the workers, or None when the workers can't be
+        started from the current interpreter (or they failed to start once).
+
+    startPool       :: func( int ) -> multiprocessing.pool.Pool
+        New pool of workers that answered within START_TIMEOUT seconds.
+
+    sharedPool      :: func( int ) -> multiprocessing.pool.Pool or None
+        Pool of workers kept for the whole session (see startPool).
+
+    collect         :: func( multiprocessing.pool.Pool , AsyncResult ) -> object
+        Waits for the result of a task of a shared pool. Raises
+        ChildProcessError when a worker of the pool exits.
+
+    picklable       :: func( object ) -> bool
+        True when an object can be sent to the workers.
+
+    PARALLEL_AREA   :: int
+        Minimum number of pixels of a frame to be grown by ParallelGrow.
+
+    SHARED_AREA     :: int
+        Minimum number of pixels of a frame to be sent to the workers through
+        shared memory. The smaller frames are pickled.
+
+    START_TIMEOUT   :: float
+        Seconds to wait for the workers of a new pool to start. The
+        interpreter given by findPython can import this plugin, so they only
+        fail to start when something else goes wrong, and then the pool
+        would start them again forever.
+
+    POLL_INTERVAL   :: float
+        Seconds between the checks of the workers done by collect.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .AlphaGrowRegions import BandGrow , PatchGrow , ComponentGrow , crop , paste , ALPHA
+from .Recipe    import runPlan
+import multiprocessing
+import atexit
+import subprocess
+import shutil
+import pickle
+import sys
+import os
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    SharedMemory = None     # Python < 3.8
+
+PARALLEL_AREA = 1 << 22
+SHARED_AREA   = 1 << 16
+START_TIMEOUT = 5.0
+POLL_INTERVAL = 0.5
+
+_CONTEXT = []   # [multiprocessing.context or None]: result of processContext.
+_POOLS   = {}   # { int : multiprocessing.pool.Pool }: pools of sharedPool by number of workers.
+_WORKERS = {}   # { multiprocessing.pool.Pool : frozenset }: process ids of the workers of each shared pool.
+_GROWS   = {}   # { (class,class,bool) : Grow }: Grow objects kept by a worker process.
+
+def _is_python( path ):
+    """ RETURNS
+            bool. True when the path is a file named like a Python interpreter. """
+    return ( bool( path ) and os.path.isfile( path ) and
+             os.path.basename( path ).lower().startswith( "python" ) )
+
+def _can_import( path ):
+    """ RETURNS
+            bool. True when the interpreter has the same major and minor version as
+            the current one and, with the sys.path of the current one (the workers
+            receive it), it can import this module. Otherwise, the workers would
+            exit as soon as they start, and the pool would start them again forever. """
+    probe = ( f"import sys; assert sys.version_info[:2] == {tuple( sys.version_info[:2] )!r}; "
+              f"sys.path[:0] = {sys.path!r}; import {__name__}" )
+    try:
+        answer = subprocess.run( [ path , "-c" , probe ] , stdout = subprocess.DEVNULL ,
+                                 stderr = subprocess.DEVNULL , timeout = 30 )
+    except ( OSError , subprocess.SubprocessError ):
+        return False
+    return answer.returncode == 0
+
+def findPython():
+    """
+        RETURNS
+            str or None. sys.executable when it's a Python interpreter. Otherwise,
+            a Python interpreter that can import this plugin (see _can_import),
+            searched in the installation of the embedded Python and then in
+            the PATH.
+    """
+    if _is_python( sys.executable ):
+        return sys.executable
+
+    major , minor = sys.version_info[:2]
+    names   = [ f"python{major}.{minor}" , f"python{major}" , "python" ]
+    suffix  = ".exe" if os.name == "nt" else ""
+    folders = [ sys.exec_prefix , os.path.join( sys.exec_prefix , "bin" ) ,
+                os.path.dirname( sys.executable or "" ) ]
+    candidates  = [ getattr( sys , "_base_executable" , None ) ]
+    candidates += [ os.path.join( folder , name + suffix ) for folder in folders for name in names ]
+    candidates += [ shutil.which( name ) for name in names ]
+
+    for candidate in dict.fromkeys( candidates ):
+        if _is_python( candidate ) and _can_import( candidate ):
+            return candidate
+    return None
+
+def processContext():
+    """
+        RETURNS
+            multiprocessing.context or None. The workers are started with "spawn",
+            because forking a process with running threads (like Krita) isn't
+            safe. When Python is embedded, the workers are started with the
+            interpreter given by findPython. It's None when there isn't any.
+        The result is computed only once, and it's None after a pool that
+        failed to start (see startPool).
+    """
+    if not _CONTEXT:
+        executable = findPython()
+        context    = None
+        if executable:
+            context = multiprocessing.get_context( "spawn" )
+            if executable != sys.executable:
+                context.set_executable( executable )
+        _CONTEXT.append( context )
+    return _CONTEXT[0]
+
+def picklable( value ):
+    """ RETURNS
+            bool. True when the value can be pickled (for example, a compiled recipe
+            without custom policies made with lambdas). """
+    try:
+        pickle.dumps( value )
+    except Exception:
+        return False
+    return True
+
+def _ping():
+    """ RETURNS
+            int. Process id of the worker. Used to know if the workers can start. """
+    return os.getpid()
+
+def startPool( processes ):
+    """
+        ARGUMENTS
+            processes(int): number of worker processes.
+        RETURNS
+            multiprocessing.pool.Pool. New pool whose workers answered within
+            START_TIMEOUT seconds.
+        Raises an exception when the workers can't start. Then the failure is
+        recorded, so processContext returns None and the later calls fall back
+        to a single process right away.
+    """
+    context = processContext()
+    if context is None:
+        raise RuntimeError( "There isn't any Python interpreter to start the worker processes." )
+    pool = None
+    try:
+        pool = context.Pool( processes )
+        pool.apply_async( _ping ).get( timeout = START_TIMEOUT )
+    except Exception:
+        if pool is not None:
+            pool.terminate()
+        _CONTEXT[:] = [ None ]
+        raise
+    return pool
+
+def sharedPool( processes ):
+    """
+        ARGUMENTS
+            processes(int): number of worker processes.
+        RETURNS
+            multiprocessing.pool.Pool or None. Pool kept for the whole session, so
+            the frames don't pay the start of new workers. None when the workers
+            can't start (see startPool).
+    """
+    pool = _POOLS.get( processes )
+    if pool is None and processContext() is not None:
+        try:
+            pool = _POOLS[processes] = startPool( processes )
+        except Exception:
+            return None
+        _WORKERS[pool] = _workers( pool )
+    return pool
+
+def _workers( pool ):
+    """ RETURNS
+            frozenset. Process ids of the running workers of a pool. """
+    # NOTE: Pool doesn't tell when a worker exits. It just replaces it.
+    return frozenset( process.pid for process in getattr( pool , "_pool" , () )
+                      if process.exitcode is None )
+
+def collect( pool , result ):
+    """
+        ARGUMENTS
+            pool(multiprocessing.pool.Pool):            pool given by sharedPool.
+            result(multiprocessing.pool.AsyncResult):   result of a task sent to the pool.
+        RETURNS
+            object. The value of the result.
+        A worker that exits in the middle of a task (for example, killed when the
+        system runs out of memory) is replaced, but its task is lost and the result
+        would never be ready. Then the pool is terminated (sharedPool starts a new
+        one on the next call) and ChildProcessError is raised, so the caller can
+        do the remaining work by itself.
+    """
+    while not result.ready():
+        result.wait( POLL_INTERVAL )
+        if not result.ready() and _workers( pool ) != _WORKERS.get( pool ):
+            for processes , shared in list( _POOLS.items() ):
+                if shared is pool:
+                    del _POOLS[processes]
+            _WORKERS.pop( pool , None )
+            pool.terminate()
+            raise ChildProcessError( "A worker process exited before its task was done." )
+    return result.get()
+
+@atexit.register
+def _close_pools():
+    """ Stops the workers of the shared pools. """
+    for pool in _POOLS.values():
+        pool.terminate()
+    _POOLS.clear()
+    _WORKERS.clear()
+
+def _grow_frame( job ):
+    """
+        ARGUMENTS
+            job(tuple): ( region , engine , incremental , plan , source , target , width , size )
+                region(class or None):  RegionGrow subclass used on the frame.
+                engine(class):          Grow engine.
+                incremental(bool):      reuse the result of the previous frame of the worker.
+                plan([Recipe.STEP]):    compiled recipe.
+                source(str or bytes):   name of the shared input, or the alpha data.
+                target(str or None):    name of the shared output.
+                width , size(int):      width and number of pixels of the frame.
+        RETURNS
+            ( int , bool or bytearray , bool ). Process id of the worker, True when the
+            border was written into the shared output (or the border itself), and True
+            when the frame was made from the previous one.
+        The Grow objects are kept between the tasks of a worker.
+    """
+    region , engine , incremental , plan , source , target , width , size = job
+    if isinstance( source , str ):
+        shared = SharedMemory( name = source )
+        try:
+            alpha = bytearray( shared.buf[ :size ] )
+        finally:
+            shared.close()
+    else:
+        alpha = bytearray( source )
+
+    key  = ( region , engine , incremental )
+    grow = _GROWS.get( key )
+    if grow is None:
+        if region is not None:
+            grow = region.singleton( engine = engine )
+        elif incremental:
+            grow = PatchGrow.singleton( engine = engine )
+        else:
+            grow = engine.singleton()
+        _GROWS[key] = grow
+
+    patched = getattr( grow , "patched" , 0 )
+    grow.setData( alpha , width , size )
+    runPlan( grow , plan )
+    border  = grow.difference_with( alpha )
+    patched = getattr( grow , "patched" , 0 ) > patched
+
+    if target is None:
+        return ( os.getpid() , border , patched )
+    shared = SharedMemory( name = target )
+    try:
+        shared.buf[ :size ] = border
+    finally:
+        shared.close()
+    return ( os.getpid() , True , patched )
+
+def _grow_frames( jobs ):
+    """
+        ARGUMENTS
+            jobs([tuple]):  frames of a unit (see _grow_frame), in timeline order.
+        RETURNS
+            [( int , bool or bytearray , bool )]. The result of each frame.
+        Worker task. The frames are grown one after another, so each one can be
+        made from the previous one (see AlphaGrowRegions.PatchGrow).
+    """
+    return [ _grow_frame( job ) for job in jobs ]
+
+def _grow_band( job ):
+    """
+        ARGUMENTS
+            job(tuple): ( engine , steps , source , target , width , height , region , halo )
+                engine(class):          Grow engine.
+                steps([(str,tuple,int)]): steps recorded by a RegionGrow.
+                source(str or bytes):   name of the shared input, or the window of the band.
+                target(str or None):    name of the shared output.
+                width , height(int):    size of the frame.
+                region((x,y,w,h)):      band (or any other rectangle) that will be grown.
+                halo(int):              extra pixels read around the rectangle.
+        RETURNS
+            bool or bytearray or None. None when the band can't change. Otherwise, True
+            when the interior was written into the shared output, or the interior itself.
+        Worker task. It must be a module level function, so it can be pickled.
+    """
+    engine , steps , source , target , width , height , ( x , y , w , h ) , halo = job
+    left   = max( 0 , x - halo )
+    top    = max( 0 , y - halo )
+    right  = min( width  , x + w + halo )
+    bottom = min( height , y + h + halo )
+    wwidth = right - left
+
+    if isinstance( source , str ):
+        shared = SharedMemory( name = source )
+        try:
+            window = crop( shared.buf , width , left , top , wwidth , bottom - top )
+        finally:
+            shared.close()
+    else:
+        window = bytearray( source )
+
+    transparent = window.count( 0 )
+    if not transparent or transparent == len( window ):
+        return None
+
+    inner = engine.singleton()
+    inner.setData( window , wwidth , len( window ) )
+    for kernel , args , _ in steps:
+        getattr( inner , kernel )( *args )
+    interior = crop( inner.unlift_data() , wwidth , x - left , y - top , w , h )
+
+    if target is None:
+        return interior
+    shared = SharedMemory( name = target )
+    try:
+        paste( shared.buf , width , interior , x , y , w , h )
+    finally:
+        shared.close()
+    return True
+
+class ParallelGrow( BandGrow ):
+    """
+        A ParallelGrow object grows its bands in a pool of worker processes.
+        It falls back to BandGrow (one band at a time in this process) when
+        the workers can't be used: there's only one process, the workers
+        can't be started (see processContext and sharedPool), the steps
+        can't be pickled (for example, custom policies made with lambdas) or
+        a worker exits or fails in the middle of the bands (see collect).
+
+        The workers are shared by every ParallelGrow with the same number of
+        processes, and they live until the end of the session.
+    """
+    def __init__( self , data , width , size , engine = None , bandHeight = None , processes = None ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each band.
+                bandHeight(int):    minimal number of rows of each band. When it's None,
+                                    the frame is split into 4 bands per process.
+                processes(int):     number of worker processes. Uses os.cpu_count() when it's None.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.parallel  = 0  # Int: Number of frames grown by the workers.
+        super().__init__( data , width , size , engine , bandHeight )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None , engine = None , bandHeight = None , processes = None ):
+        """ RETURNS
+                Trivial ParallelGrow object. """
+        return cls( bytearray() , 0 , 0 , engine , bandHeight , processes )
+
+    def __regions__( self , thickness ):
+        """
+            ARGUMENTS
+                thickness(int): number of pixels that the recorded steps can grow.
+            RETURNS
+                [(x,y,w,h)]. The bands of the frame.
+        """
+        width  = self.width
+        height = self.height
+        rows   = self.bandHeight or -(-height // (4 * self.processes))
+        band   = max( rows , 2 * thickness , 1 )
+        return [ ( 0 , y , width , min( band , height - y ) ) for y in range( 0 , height , band ) ]
+
+    def __stream__( self , combine ):
+        """
+            ARGUMENTS
+                combine( function(bytearray,int,int) -> bytes ): see BandGrow.__stream__.
+            RETURNS
+                bytearray. The output of every band.
+        """
+        size    = self.size
+        if ( self.processes < 2 or processContext() is None or not size or
+             not self.steps or not self.hasFrontier() ):
+            return super().__stream__( combine )
+        if not picklable( ( self.engine , self.steps ) ):
+            return super().__stream__( combine )
+        pool = sharedPool( self.processes )
+        if pool is None:
+            return super().__stream__( combine )
+        try:
+            return self.__parallel_stream__( pool , combine )
+        except Exception:
+            # A worker exited or failed (see collect): the bands are grown here.
+            return super().__stream__( combine )
+
+    def __parallel_stream__( self , pool , combine ):
+        """
+            ARGUMENTS
+                pool(multiprocessing.pool.Pool):    workers that grow the bands.
+                combine( function(bytearray,int,int) -> bytes ): see BandGrow.__stream__.
+            RETURNS
+                bytearray. The output of every band, grown by the workers.
+        """
+        size      = self.size
+        width     = self.width
+        height    = self.height
+        data      = self.data
+        thickness = self.thickness()
+        regions   = self.__regions__( thickness )
+        output    = bytearray( size )
+
+        source = target = None
+        try:
+            if SharedMemory is not None:
+                source = SharedMemory( create = True , size = size )
+                target = SharedMemory( create = True , size = size )
+                source.buf[:size] = data[:size]
+                jobs = [ ( self.engine , self.steps , source.name , target.name , width , height , region , thickness )
+                         for region in regions ]
+            else:
+                jobs = []
+                for x , y , w , h in regions:
+                    top    = max( 0 , y - thickness )
+                    bottom = min( height , y + h + thickness )
+                    window = bytes( data[ top * width : bottom * width ] )
+                    jobs.append( ( self.engine , self.steps , window , None , width , bottom - top ,
+                                   ( x , y - top , w , h ) , thickness ) )
+
+            results = collect( pool , pool.map_async( _grow_band , jobs , chunksize = 1 ) )
+
+            self.regions = 0
+            for ( x , y , w , h ) , result in zip( regions , results ):
+                start = y * width
+                end   = start + h * width
+                if result is None:
+                    band = data[ start : end ].translate( ALPHA )
+                else:
+                    band = bytes( target.buf[ start : end ] ) if result is True else result
+                    self.regions += 1
+                output[ start : end ] = combine( band , start , end )
+            self.parallel += 1
+            return output
+        finally:
+            for shared in ( source , target ):
+                if shared is not None:
+                    shared.close()
+                    shared.unlink()
+
+class ParallelComponentGrow( ComponentGrow ):
+    """
+        A ParallelComponentGrow object grows its groups of blobs in a pool of
+        worker processes, through shared memory. The groups never overlap, so
+        the workers write them into the same shared result. It falls back to
+        ComponentGrow when the workers can't be used or fail (see ParallelGrow),
+        when there isn't shared memory (Python < 3.8) or when there's a single group.
+    """
+    def __init__( self , data , width , size , engine = None , processes = None ):
+        """
+            ARGUMENTS
+                data(bytearray):    alpha data.
+                width(int):         width of the canvas.
+                size(int):          size or raw length of the alpha data.
+                engine(class):      Grow engine used on each group.
+                processes(int):     number of worker processes. Uses os.cpu_count() when it's None.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.parallel  = 0  # Int: Number of frames grown by the workers.
+        super().__init__( data , width , size , engine )
+
+    @classmethod
+    def singleton( cls , amount_of_items_on_search = None , engine = None , processes = None ):
+        """ RETURNS
+                Trivial ParallelComponentGrow object. """
+        return cls( bytearray() , 0 , 0 , engine , processes )
+
+    def __grow_regions__( self , regions , thickness ):
+        """
+            ARGUMENTS
+                regions([(x,y,w,h)]):   groups that must be grown.
+                thickness(int):         number of pixels that the recorded steps can grow.
+            Grows the groups in the workers, and copies the shared result. """
+        if ( self.processes < 2 or processContext() is None or SharedMemory is None or
+             len( regions ) < 2 or not picklable( ( self.engine , self.steps ) ) ):
+            return super().__grow_regions__( regions , thickness )
+        pool = sharedPool( self.processes )
+        if pool is None:
+            return super().__grow_regions__( regions , thickness )
+
+        size   = self.size
+        halo   = self.__halo__( thickness )
+        source = target = None
+        try:
+            source = SharedMemory( create = True , size = size )
+            target = SharedMemory( create = True , size = size )
+            source.buf[:size] = self.data[:size]
+            target.buf[:size] = self._grown
+            jobs = [ ( self.engine , self.steps , source.name , target.name , self.width , self.height , region , halo )
+                     for region in regions ]
+
+            chunks  = max( 1 , len( jobs ) // (4 * self.processes) )
+            results = collect( pool , pool.map_async( _grow_band , jobs , chunksize = chunks ) )
+
+            self._grown[:] = target.buf[:size]
+            self.regions  += sum( 1 for result in results if result )
+            self.parallel += 1
+        except Exception:
+            # A worker exited or failed (see collect): the groups are grown here.
+            return super().__grow_regions__( regions , thickness )
+        finally:
+            for shared in ( source , target ):
+                if shared is not None:
+                    shared.close()
+                    shared.unlink()
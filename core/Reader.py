@@ -12,6 +12,11 @@
         + Notify the current progress of the border generation process.
         + Notify errors or events occurred in the process.
         + Modifies the status of the program when something goes wrong.
+        + Crops each frame to the bounds of its content.
+        + Reuses the frames read by the previous runs (see FrameCache).
+
+    SAMPLE_LINES :: int
+        Number of rows and columns of the read area used by Reader.fingerprint.
 
     [*] Author
      |- Gaps : sGaps : ArtGaps
@@ -19,9 +24,15 @@
 from .Arguments   import KisData
 from .KisStatus   import KisStatus , ALPHA
 from .Service     import Client
+from .AlphaScrapper import Scrapper
+from .FrameCache  import SNAPSHOT
+from .Recipe      import planSteps
 from queue        import SimpleQueue
+from hashlib      import blake2b
 from PyQt5.QtCore import QRect
 
+SAMPLE_LINES = 64
+
 class Reader( object ):
     """ Reads data from the frames of a Krita's Node, and put it into outQueue.
         If outQueue is not provided, it will allocate a SimpleQueue. """
@@ -50,14 +61,180 @@ class Reader( object ):
                                                         side of the document_bounds
             RETURNS
                 QRect, which represents the bounds of the target layer. """
-        nBounds = node.bounds()
+        return Reader.expandBounds( node.bounds() , document_bounds , thickness )
 
+    @staticmethod
+    def expandBounds( nBounds , document_bounds , thickness ):
+        """
+            ARGUMENTS
+                nBounds(PyQt5.QtCore.QRect):            bounds of the source node.
+                document_bounds(PyQt5.QtCore.QRect):    Bounds of the document.
+                thickness(int):                         how many pixels will be added to every
+                                                        side of the node bounds.
+            RETURNS
+                QRect. See getBounds. """
         pBounds = QRect( nBounds.x()      - thickness   ,
                          nBounds.y()      - thickness   ,
                          nBounds.width()  + 2*thickness ,
                          nBounds.height() + 2*thickness )
         return document_bounds.intersected( pBounds )
 
+    @staticmethod
+    def contentBounds( alpha , bounds ):
+        """
+            ARGUMENTS
+                alpha(bytearray):               alpha data extracted by a Scrapper.
+                bounds(PyQt5.QtCore.QRect):     bounds of the alpha data.
+            RETURNS
+                QRect or None. Tight bounds of the opaque pixels of the frame, or None
+                when the frame doesn't have any opaque pixel. """
+        opaque = Scrapper.OPAQUE
+        width  = bounds.width()
+        first  = alpha.find( opaque )
+        if first < 0 or not width: return None
+        top    = first // width
+        bottom = alpha.rfind( opaque ) // width
+
+        # The rows are joined as big integers, so the columns with an opaque pixel
+        # are found at once:
+        columns = 0
+        for start in range( top * width , (bottom + 1) * width , width ):
+            columns |= int.from_bytes( alpha[start:start + width] , "little" )
+        columns = columns.to_bytes( width , "little" )
+        left    = columns.find( opaque )
+        right   = columns.rfind( opaque )
+        return QRect( bounds.x() + left , bounds.y() + top , right - left + 1 , bottom - top + 1 )
+
+    @staticmethod
+    def isDirect( node ):
+        """ RETURNS
+                bool. True when the content of the node can be read at any time without
+                changing the time of the document: a paint layer without masks. """
+        return node.type() == "paintlayer" and not node.childNodes()
+
+    @staticmethod
+    def fingerprint( nodes , rect , time , current ):
+        """
+            ARGUMENTS
+                nodes([krita.Node]):            nodes that define a frame.
+                rect(PyQt5.QtCore.QRect):       area of the frame (the bounds read from the source).
+                time(int):                      time of the frame.
+                current(bool):                  the document is at that time.
+            RETURNS
+                bytes or None. Digest of the nodes inside the area at that time, or None
+                when the frame can't be fingerprinted.
+
+            Only SAMPLE_LINES rows and SAMPLE_LINES columns spread over the area are
+            read (all of them on the small areas), so checking a frame costs a small
+            part of reading it again: a change between these lines isn't noticed.
+
+            The paint layers without masks are read with pixelDataAtTime, so the time
+            of the document isn't changed. The groups and the layers with masks are
+            read from their projection, which only exists for the current time. The
+            bounds of the nodes are compared too, except on the animated paint layers
+            (they only give the bounds of the current time).
+        """
+        digest  = blake2b( digest_size = 20 )
+        left , top , width , height = rect.x() , rect.y() , rect.width() , rect.height()
+        rows    = [ ( left , y , width , 1 ) for y in range( top , top + height , max( 1 , height // SAMPLE_LINES ) ) ]
+        columns = [ ( x , top , 1 , height ) for x in range( left , left + width , max( 1 , width // SAMPLE_LINES ) ) ]
+        for node in nodes:
+            direct   = Reader.isDirect( node )
+            animated = direct and node.animated()
+            if not direct and not current:
+                return None
+            header = f"{node.uniqueId().toString()}|{node.colorModel()}|{node.colorDepth()}|{node.opacity()}|{node.visible()}|{animated}"
+            if not animated:
+                bounds  = node.bounds()
+                header += f"|{bounds.x()},{bounds.y()},{bounds.width()},{bounds.height()}"
+            digest.update( header.encode( "utf-8" ) )
+            for x , y , w , h in rows + columns:
+                data = ( node.projectionPixelData( x , y , w , h )    if not direct else
+                         node.pixelDataAtTime( x , y , w , h , time ) if animated   else
+                         node.pixelData( x , y , w , h ) )
+                if not len( data ):
+                    return None
+                digest.update( data )
+        return digest.digest()
+
+    @staticmethod
+    def place( alpha , bounds , area ):
+        """
+            ARGUMENTS
+                alpha(bytearray):               alpha data.
+                bounds(PyQt5.QtCore.QRect):     bounds of the alpha data.
+                area(PyQt5.QtCore.QRect):       bounds of the result.
+            RETURNS
+                bytearray. The alpha data of the pixels inside the area. The pixels
+                outside the bounds are transparent. """
+        result  = bytearray( area.width() * area.height() )
+        overlap = bounds.intersected( area )
+        if overlap.isEmpty():
+            return result
+        width   = overlap.width()
+        left    = overlap.x() - bounds.x()
+        target  = overlap.x() - area.x()
+        for y in range( overlap.y() , overlap.y() + overlap.height() ):
+            source = (y - bounds.y()) * bounds.width() + left
+            start  = (y - area.y())   * area.width()   + target
+            result[ start : start + width ] = alpha[ source : source + width ]
+        return result
+
+    @staticmethod
+    def crop( alpha , bounds , area ):
+        """
+            ARGUMENTS
+                alpha(bytearray):               alpha data.
+                bounds(PyQt5.QtCore.QRect):     bounds of the alpha data.
+                area(PyQt5.QtCore.QRect):       bounds of the result (inside the bounds).
+            RETURNS
+                bytearray. The alpha data of the pixels inside the area. """
+        width  = bounds.width()
+        left   = area.x() - bounds.x()
+        right  = left + area.width()
+        top    = area.y() - bounds.y()
+        bottom = top + area.height()
+        return bytearray().join( alpha[ y * width + left : y * width + right ] for y in range( top , bottom ) )
+
+    @staticmethod
+    def tighten( alpha , bounds , margin , content = False ):
+        """
+            ARGUMENTS
+                alpha(bytearray):               alpha data extracted by a Scrapper.
+                bounds(PyQt5.QtCore.QRect):     bounds of the alpha data.
+                margin(int):                    number of pixels that the border can grow.
+                content(QRect or None):         bounds of the content, when they're known.
+            RETURNS
+                ( bytearray , QRect ). The alpha data cropped to its content plus the
+                margin, and its new bounds. A frame without opaque pixels gets empty
+                bounds.
+
+            The grow steps never reach the pixels that are farther than [margin] pixels
+            from the content, so the border of the cropped frame is the same. """
+        if content is False:
+            content = Reader.contentBounds( alpha , bounds )
+        if content is None:
+            return bytearray() , QRect( bounds.x() , bounds.y() , 0 , 0 )
+        area = content.adjusted( -margin , -margin , margin , margin ).intersected( bounds )
+        if area == bounds:
+            return alpha , bounds
+        return Reader.crop( alpha , bounds , area ) , area
+
+    @staticmethod
+    def restore( snapshot , bounds , margin ):
+        """
+            ARGUMENTS
+                snapshot(FrameCache.SNAPSHOT):  frame stored in a FrameCache.
+                bounds(PyQt5.QtCore.QRect):     bounds of the frame (inside the ones read).
+                margin(int):                    number of pixels that the border can grow.
+            RETURNS
+                ( bytearray , QRect ). Same as tighten, for a frame that isn't read again. """
+        content = snapshot.content
+        if content is None:
+            return bytearray() , QRect( bounds.x() , bounds.y() , 0 , 0 )
+        area = content.adjusted( -margin , -margin , margin , margin ).intersected( bounds )
+        return Reader.place( snapshot.alpha , content , area ) , area
+
     def run( self ):
         """
             Extract all alpha information of a Source Node in a Krita's Document timeline.
@@ -75,6 +252,9 @@ class Reader( object ):
         scrap        = self.args.scrapper       # AlphaScrapper.Scrapper
         dbounds      = doc.bounds()             # QRect
         constraint   = self.args.constraint     # Take bounds from this node.
+        margin       = max( thickness , planSteps( self.args.plan ) )
+        frames       = getattr( self.args , "frameCache" , None )  # FrameCache.FrameCache
+        nodes        = [ source ] if constraint is source else [ source , constraint ]
 
         server     = self.args.service
         client     = Client( server )
@@ -95,6 +275,11 @@ class Reader( object ):
         colordata = bytearray()
         bounds    = QRect(0,0,0,0)
         getBounds = Reader.getBounds
+        expand    = Reader.expandBounds
+        tighten   = Reader.tighten
+        saved     = 0
+        reused    = 0
+        uncached  = 0
 
         # Single frame!
         if not timeline:
@@ -105,14 +290,46 @@ class Reader( object ):
                 report( "core.Reader: Canceled by user." )
                 return
 
+            # Frames read by a previous run:
+            if frames:
+                key      = frames.key( doc , source , constraint , t , transparency , threshold )
+                current  = t == doc.currentTime()
+                snapshot = None
+                if current or all( Reader.isDirect( node ) for node in nodes ):
+                    snapshot = frames.get( key , lambda snapshot: Reader.fingerprint( nodes , snapshot.read , t , current ) )
+                else:
+                    uncached += 1
+                if snapshot is not None:
+                    bounds = expand( snapshot.nodeBounds , dbounds , thickness )
+                    if snapshot.read.contains( bounds ):
+                        alpha , bounds = Reader.restore( snapshot , bounds , margin )
+                        raw_frames.put( ALPHA(alpha, t, bounds) )
+                        reused += 1
+                        stepDone()
+                        continue
+
             client.serviceRequest( doc.setCurrentTime , t )
             client.serviceRequest( doc.refreshProjection  )
             client.serviceRequest( doc.waitForDone        )
 
             # Clean previous data
             #bounds = getBounds( source , dbounds , thickness )
-            bounds = getBounds( constraint , dbounds , thickness )
-            alpha  = scrap.extractAlpha( source , bounds , transparency , threshold )
+            nBounds = constraint.bounds()
+            bounds  = expand( nBounds , dbounds , thickness )
+            alpha   = scrap.extractAlpha( source , bounds , transparency , threshold )
+            content = Reader.contentBounds( alpha , bounds )
+            fingerprint = Reader.fingerprint( nodes , bounds , t , True ) if frames else None
+            if fingerprint:
+                stored = Reader.crop( alpha , bounds , content ) if content is not None else bytearray()
+                frames.put( key , SNAPSHOT( bounds , nBounds , content , stored , fingerprint ) )
+
+            # Crop the empty margins of the node bounds:
+            area           = bounds.width() * bounds.height()
+            alpha , bounds = tighten( alpha , bounds , margin , content )
+            cropped        = area - bounds.width() * bounds.height()
+            saved         += cropped
+            if cropped:
+                report( f"Frame {t}: cropped to {bounds.width()}x{bounds.height()} ; {cropped} pixels saved ({100 * cropped / area:.1f}%)" )
 
             # Submit changes ------------------------
             raw_frames.put( ALPHA(alpha, t, bounds) )
@@ -120,3 +337,10 @@ class Reader( object ):
             # [*] PROGRESS BAR:
             stepDone()
 
+        if saved:
+            report( f"Cropped frames: {saved} pixels saved" )
+        if frames:
+            report( f"Frames reused from the session: {reused} ; {frames.stats()}" )
+        if uncached:
+            report( f"Frames that can't be reused from the session: {uncached} (the groups and the layers "
+                     "with masks are only reused on the current time)" )
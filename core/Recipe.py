@@ -0,0 +1,147 @@
+# Module:   core.Recipe.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# ---------------------------------------------
+"""
+    Compiles grow recipes into simpler execution plans. A recipe is compiled
+    once per job, and its plan is applied to each frame.
+
+    [:] Defined in this module
+    --------------------------
+    STEP :: namedtuple( str , tuple , int )
+        A compiled step: grow.<kernel>( *args ) applied [times] times.
+
+    EQUIVALENT :: dict
+        Maps the name of a grow method to the name of another grow method that
+        makes exactly the same changes.
+
+    DIAMOND_METHODS :: set
+        Names of the grow methods that are equivalent to a diamond dilation
+        of radius 1.
+
+    SHAPE_METHODS :: dict
+        Maps the name of a shaped grow method to its shape (see Shapes). In a
+        recipe, the steps of these methods are the radius of the shape.
+
+    ADDITIVE_SHAPES :: set
+        Shapes where two dilations of radius a and b are the same as one
+        dilation of radius a + b.
+
+    compileRecipe :: func( [(Grow.method,int)] ) -> [STEP]
+        Builds an execution plan from a recipe.
+
+    runPlan :: func( Grow , [STEP] ) -> Grow
+        Applies an execution plan to any Grow engine.
+
+    planSteps :: func( [STEP] ) -> int
+        Number of pixels that an execution plan can grow.
+
+    showPlan :: func( [STEP] ) -> str
+        Readable version of an execution plan.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from collections import namedtuple
+from .Shapes     import reach
+
+class STEP(
+    namedtuple(
+        typename    = 'STEP',
+        field_names = ['kernel','args','times']
+              )
+           ):
+    def __str__( self ):
+        args  = ",".join( str(a) for a in self.args )
+        times = f" x{self.times}" if self.times > 1 else ""
+        return f"{self.kernel}({args}){times}"
+
+EQUIVALENT      = { "force_grow" : "any_neighbor_grow" }
+DIAMOND_METHODS = { "any_neighbor_grow" }
+SHAPE_METHODS   = { "square_grow"  : "square"  ,
+                    "octagon_grow" : "octagon" ,
+                    "disc_grow"    : "disc"    }
+ADDITIVE_SHAPES = { "square" }
+
+def compileRecipe( recipe ):
+    """
+        ARGUMENTS
+            recipe([(Grow.method,int)]): smart recipe descriptor (see KisData.pairToMethod).
+        RETURNS
+            [STEP]. Execution plan.
+
+        The compilation:
+            1. Drops the entries without steps.
+            2. Replaces each method by its canonical equivalent (force -> any-neighbor).
+            3. Joins the adjacent entries that use the same method (the shaped
+               methods are joined only when their shape is additive).
+            4. Lowers the any-neighbor runs into a single diamond_grow kernel,
+               and each shaped method into a single shape_grow kernel.
+    """
+    # (1) & (2):
+    names = [ ( EQUIVALENT.get( task.__name__ , task.__name__ ) , steps )
+              for task , steps in recipe if steps > 0 ]
+
+    # (3):
+    fused = []
+    for name , steps in names:
+        shape = SHAPE_METHODS.get( name )
+        if fused and fused[-1][0] == name and ( not shape or shape in ADDITIVE_SHAPES ):
+            fused[-1][1] += steps
+        else:
+            fused.append( [name , steps] )
+
+    # (4):
+    plan = []
+    for name , steps in fused:
+        if name in DIAMOND_METHODS and steps > 1:
+            plan.append( STEP( "diamond_grow" , (steps,) , 1 ) )
+        elif name in SHAPE_METHODS:
+            plan.append( STEP( "shape_grow" , (SHAPE_METHODS[name] , steps) , 1 ) )
+        else:
+            plan.append( STEP( name , () , steps ) )
+    return plan
+
+def runPlan( grow , plan ):
+    """
+        ARGUMENTS
+            grow(AlphaGrow.Grow):   Grow object (or any other Grow engine).
+            plan([STEP]):           execution plan made by compileRecipe.
+        RETURNS
+            AlphaGrow.Grow
+        Applies the execution plan to the grow object. It stops as soon as
+        the grow object doesn't have a frontier, because the remaining steps
+        can't change anything. The frontier is checked before each repetition
+        of a step, so a fused step (like corners_grow x50) stops too. """
+    for kernel , args , times in plan:
+        task = getattr( grow , kernel )
+        for _ in range(times):
+            if not grow.hasFrontier():
+                return grow
+            task( *args )
+    return grow
+
+def planSteps( plan ):
+    """
+        ARGUMENTS
+            plan([STEP]): execution plan made by compileRecipe.
+        RETURNS
+            int. Number of pixels that the plan can grow in any direction. It's
+            used as the cost of the plan per pixel of a frame. """
+    steps = 0
+    for kernel , args , times in plan:
+        if kernel == "diamond_grow":
+            steps += args[0] * times
+        elif kernel == "shape_grow":
+            steps += reach( *args ) * times
+        else:
+            steps += times
+    return steps
+
+def showPlan( plan ):
+    """
+        ARGUMENTS
+            plan([STEP]): execution plan made by compileRecipe.
+        RETURNS
+            str. Readable version of the plan. """
+    return " -> ".join( str(step) for step in plan ) or "(empty)"
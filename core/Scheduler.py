@@ -0,0 +1,102 @@
+# Module:   core.Scheduler.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# ------------------------------------------------
+"""
+    Orders the frames that must be grown, so the workers finish at about the
+    same time, and measures how the work was spread between them.
+
+    The cost of a frame is estimated as its area times the number of steps
+    of the recipe. The most expensive frames are grown first: when the
+    cheap frames are left for the end, a worker that takes an expensive
+    frame late doesn't keep the others waiting. The order of the borders
+    doesn't matter, because each one is exported with its own time.
+
+    The frames are scheduled in units: runs of consecutive frames (in the
+    timeline) with the same size, grown one after another by the same
+    worker. So the incremental grow (see AlphaGrowRegions.PatchGrow) can
+    patch the result of the previous frame, instead of the result of a
+    frame of another part of the timeline.
+
+    [:] Defined in this module
+    --------------------------
+    frameCost   :: func( ALPHA , int ) -> int
+        Estimated cost of growing a frame.
+
+    schedule    :: func( SimpleQueue<ALPHA> , [Recipe.STEP] , int ) -> SimpleQueue<[ALPHA]>
+        Splits the frames into units, sorted by cost (largest first).
+
+    balance     :: func( { str : [int,int] } ) -> str
+        Readable summary of the work done by each worker.
+
+    UNIT_SIZE   :: int
+        Maximum number of frames of a unit.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from .Recipe    import planSteps
+from queue      import SimpleQueue
+
+UNIT_SIZE = 16
+
+def frameCost( falpha , steps ):
+    """
+        ARGUMENTS
+            falpha(ALPHA):  frame.
+            steps(int):     number of steps of the recipe (see Recipe.planSteps).
+        RETURNS
+            int. Estimated cost of growing the frame.
+    """
+    bounds = falpha.bounds
+    return bounds.width() * bounds.height() * steps
+
+def schedule( raw_alphas , plan , workers = 1 ):
+    """
+        ARGUMENTS
+            raw_alphas(SimpleQueue<ALPHA>): frames that must be grown.
+            plan([Recipe.STEP]):            compiled recipe.
+            workers(int):                   number of workers that take the units.
+        RETURNS
+            SimpleQueue<[ALPHA]>. The same frames, split into units of consecutive
+            frames with the same size, sorted by cost (largest first). The units
+            with the same cost keep their timeline order.
+
+        The frames with the same size are split into [workers] units at least (of
+        UNIT_SIZE frames at most), so they can still be grown at the same time.
+    """
+    steps  = max( 1 , planSteps( plan ) )
+    groups = {}     # { (int,int) : [ALPHA] }: frames by size.
+    while not raw_alphas.empty():
+        falpha = raw_alphas.get_nowait()
+        bounds = falpha.bounds
+        groups.setdefault( ( bounds.width() , bounds.height() ) , [] ).append( falpha )
+
+    units = []
+    for frames in groups.values():
+        frames.sort( key = lambda falpha: falpha.time )
+        length = min( UNIT_SIZE , -(-len( frames ) // max( 1 , workers )) )
+        units += [ frames[ start : start + length ] for start in range( 0 , len( frames ) , length ) ]
+    units.sort( key = lambda unit: ( -sum( frameCost( falpha , steps ) for falpha in unit ) , unit[0].time ) )
+
+    ordered = SimpleQueue()
+    for unit in units:
+        ordered.put( unit )
+    return ordered
+
+def balance( loads ):
+    """
+        ARGUMENTS
+            loads({ str : [int,int] }): number of frames and cost grown by each worker.
+        RETURNS
+            str. Frames and share of the cost of each worker, and the imbalance: the
+            cost of the busiest worker over the mean cost (1.00 is a perfect balance).
+    """
+    total = sum( cost for _ , cost in loads.values() )
+    if not loads or not total:
+        return "no frames grown"
+    mean   = total / len( loads )
+    busy   = max( cost for _ , cost in loads.values() )
+    shares = " , ".join( f"{name}: {frames} frames ({100 * cost / total:.1f}%)"
+                         for name , ( frames , cost ) in sorted( loads.items() ) )
+    return f"{shares} ; imbalance = {busy / mean:.2f}"
@@ -0,0 +1,261 @@
+# Module:   core.Shapes.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# ---------------------------------------------
+"""
+    Dilation of the opaque pixels by a structuring element (a shape) of any
+    radius. The shapes are split into horizontal runs, and each run is made
+    with a few shifts of the whole frame, so the cost of a dilation grows
+    with log(radius) (square) or with the height of the shape (disc and
+    bitmaps) instead of making one grow step per pixel of radius.
+
+    The frames are used as boards: integers where each pixel is a group of
+    [unit] bits (unit = 1 for AlphaGrowBits.BitGrow, unit = 8 for AlphaGrow.Grow)
+    and the lowest bit of the group is on when the pixel is opaque.
+
+    [:] Defined in this module
+    --------------------------
+    SHAPES          :: set
+        Names of the available shapes.
+
+    $Shape          :: Abstraction
+        Name of a shape (see SHAPES) or a bitmap. A bitmap is a sequence of rows
+        with the same length, where each row is a str (any character except
+        " ", "." and "0" is part of the shape) or a sequence of ints (non-zero
+        elements are part of the shape). The center of the bitmap is the pixel
+        being dilated.
+
+    decompose       :: func( $Shape , int ) -> [($Shape,int)]
+        Splits a shape into simpler shapes that are applied one after another.
+
+    reach           :: func( $Shape , int ) -> int
+        Number of pixels that a shape can grow in any direction.
+
+    runs            :: func( $Shape , int ) -> { int : [(int,int)] }
+        Horizontal runs of a shape for each row offset.
+
+    dilate          :: func( int , int , int , $Shape , int , int ) -> int
+        Dilates a board by a shape.
+
+    dilateWith      :: func( _Shifter , board , $Shape , int ) -> board
+        Dilates any board that can be moved by a shifter (see _Shifter).
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+from math import sqrt
+
+SHAPES  = { "square" , "diamond" , "octagon" , "disc" }
+EMPTY   = " .0"
+DIGITS  = b"01" + bytes(254)
+
+def _isqrt( n ):
+    """ RETURNS
+            int. The biggest integer whose square isn't greater than n. """
+    root = int( sqrt( n ) )
+    while root * root > n:              root -= 1
+    while (root + 1) * (root + 1) <= n: root += 1
+    return root
+
+def decompose( shape , radius ):
+    """
+        ARGUMENTS
+            shape($Shape):  structuring element.
+            radius(int):    radius of the shape (ignored by the bitmaps).
+        RETURNS
+            [($Shape,int)]. Shapes that give the same dilation when they're applied
+            one after another. An octagon is a square of half the radius followed by
+            a diamond with the remaining radius.
+    """
+    if isinstance( shape , str ):
+        if shape not in SHAPES:
+            raise ValueError( f"{shape} is not a valid shape name. Available shapes: {SHAPES}" )
+        if radius <= 0: return []
+        if shape == "octagon":
+            return [ s for s in ( ( "square" , radius // 2 ) , ( "diamond" , radius - radius // 2 ) ) if s[1] > 0 ]
+    return [ ( shape , radius ) ]
+
+def reach( shape , radius ):
+    """
+        ARGUMENTS
+            shape($Shape):  structuring element.
+            radius(int):    radius of the shape (ignored by the bitmaps).
+        RETURNS
+            int. Number of pixels that the shape can grow in any direction.
+    """
+    if isinstance( shape , str ):
+        if shape not in SHAPES:
+            raise ValueError( f"{shape} is not a valid shape name. Available shapes: {SHAPES}" )
+        return max( 0 , radius )
+    rows = runs( shape , radius )
+    return max( [ max( abs(dy) , abs(a) , abs(b) ) for dy , row in rows.items() for a , b in row ] or [0] )
+
+def runs( shape , radius ):
+    """
+        ARGUMENTS
+            shape($Shape):  structuring element.
+            radius(int):    radius of the shape (ignored by the bitmaps).
+        RETURNS
+            { dy : [(a,b)] }. For each row offset dy, the ranges of column offsets
+            [a,b] (both inclusive) that are part of the shape.
+    """
+    if isinstance( shape , str ):
+        if shape == "square":
+            return { dy : [ (-radius , radius) ] for dy in range( -radius , radius + 1 ) }
+        if shape == "diamond":
+            return { dy : [ (abs(dy) - radius , radius - abs(dy)) ] for dy in range( -radius , radius + 1 ) }
+        if shape == "disc":
+            half = lambda dy: _isqrt( radius * radius - dy * dy )
+            return { dy : [ (-half(dy) , half(dy)) ] for dy in range( -radius , radius + 1 ) }
+        if shape == "octagon":
+            raise ValueError( "An octagon must be decomposed first (see decompose)." )
+        raise ValueError( f"{shape} is not a valid shape name. Available shapes: {SHAPES}" )
+
+    # Bitmap:
+    height = len( shape )
+    width  = len( shape[0] ) if height else 0
+    if any( len(row) != width for row in shape ):
+        raise ValueError( "The rows of a bitmap must have the same length." )
+    cx , cy = width // 2 , height // 2
+    result  = {}
+    for y , row in enumerate( shape ):
+        cells = [ (c not in EMPTY) if isinstance( c , str ) else bool(c) for c in row ]
+        spans = []
+        x     = 0
+        while x < width:
+            if cells[x]:
+                start = x
+                while x + 1 < width and cells[x + 1]: x += 1
+                spans.append( ( start - cx , x - cx ) )
+            x += 1
+        if spans: result[ y - cy ] = spans
+    return result
+
+class _Shifter( object ):
+    """
+        Shifts a board towards each direction without moving pixels from a row
+        into another one. Keeps the column masks of the shifts already used.
+
+        Other kinds of boards (like arrays) can be dilated by a subclass that
+        overrides horizontal and vertical (see dilateWith). The boards are never
+        modified in place.
+    """
+    def __init__( self , width , height , unit ):
+        self.width  = width
+        self.height = height
+        self.unit   = unit
+        self.full   = (1 << (width * height * unit)) - 1
+        self.masks  = {}
+
+    def __board__( self , pixels ):
+        """ RETURNS
+                int. Board made from a bytes object with one 0x00/0x01 byte per pixel. """
+        if self.unit == 8:
+            return int.from_bytes( pixels , "little" )
+        return int( pixels.translate( DIGITS )[::-1] , 2 ) if pixels else 0
+
+    def __mask__( self , k ):
+        """ RETURNS
+                int. Board with the pixels of the columns that can receive a shift of k columns. """
+        mask = self.masks.get( k )
+        if mask is None:
+            width = self.width
+            step  = min( abs(k) , width )
+            row   = ( bytes(step) + b"\x01" * (width - step) if k > 0 else
+                      b"\x01" * (width - step) + bytes(step) )
+            mask  = self.masks[k] = self.__board__( row * self.height )
+        return mask
+
+    def horizontal( self , board , k ):
+        """ RETURNS
+                int. Board moved k columns towards the east (or the west when k < 0). """
+        if not k: return board
+        if k > 0: return (board << (k * self.unit)) & self.__mask__( k )
+        return (board >> (-k * self.unit)) & self.__mask__( k )
+
+    def vertical( self , board , k ):
+        """ RETURNS
+                int. Board moved k rows towards the south (or the north when k < 0). """
+        if not k: return board
+        if k > 0: return (board << (k * self.width * self.unit)) & self.full
+        return board >> (-k * self.width * self.unit)
+
+    @staticmethod
+    def __extend__( board , length , shift ):
+        """ RETURNS
+                int. Board dilated by the run [0,length] (or [length,0] when length < 0),
+                where shift( board , k ) moves the board k pixels. """
+        sign   = 1 if length > 0 else -1
+        length = abs( length ) + 1
+        done   = 1
+        # Doubling: the run grows from 1 to [length] pixels.
+        while done * 2 <= length:
+            board  = board | shift( board , sign * done )
+            done  *= 2
+        if done < length:
+            board = board | shift( board , sign * (length - done) )
+        return board
+
+    def __run__( self , board , a , b , shift ):
+        """ RETURNS
+                int. Board dilated by the run [a,b].
+            The runs that contain 0 are split into [a,0] and [0,b]. The other ones are
+            moved first, so the pixels lost outside the frame can't come back. """
+        extend = _Shifter.__extend__
+        if a > 0: return extend( shift( board , a ) , b - a , shift )
+        if b < 0: return extend( shift( board , b ) , a - b , shift )
+        return extend( extend( board , a , shift ) , b , shift )
+
+    def span( self , board , a , b ):
+        """ RETURNS
+                int. Board dilated by the horizontal run [a,b]. """
+        return self.__run__( board , a , b , self.horizontal )
+
+    def column( self , board , a , b ):
+        """ RETURNS
+                int. Board dilated by the vertical run [a,b]. """
+        return self.__run__( board , a , b , self.vertical )
+
+def dilate( board , width , height , shape , radius , unit = 1 ):
+    """
+        ARGUMENTS
+            board(int):             opaque pixels.
+            width , height(int):    size of the frame.
+            shape($Shape):          structuring element (any shape except the octagon,
+                                    which must be decomposed first).
+            radius(int):            radius of the shape (ignored by the bitmaps).
+            unit(int):              number of bits per pixel of the board.
+        RETURNS
+            int. The board dilated by the shape. The opaque pixels always stay opaque,
+            and the pixels outside the frame are lost.
+    """
+    if not board or not width or not height: return board
+    return dilateWith( _Shifter( width , height , unit ) , board , shape , radius )
+
+def dilateWith( shifter , board , shape , radius ):
+    """
+        ARGUMENTS
+            shifter(_Shifter):  moves the board (and knows the size of the frame).
+            board:              opaque pixels, in any form supported by the shifter.
+            shape($Shape):      structuring element (any shape except the octagon).
+            radius(int):        radius of the shape (ignored by the bitmaps).
+        RETURNS
+            board. The board dilated by the shape. See dilate.
+    """
+    # Separable shape: a run in each direction.
+    if shape == "square":
+        return board | shifter.column( shifter.span( board , -radius , radius ) , -radius , radius )
+
+    # The rows with the same runs share one horizontal dilation:
+    groups = {}
+    for dy , spans in runs( shape , radius ).items():
+        groups.setdefault( tuple(spans) , [] ).append( dy )
+
+    result = board
+    for spans , offsets in groups.items():
+        row = 0
+        for a , b in spans:
+            row = row | shifter.span( board , a , b )
+        for dy in offsets:
+            result = result | shifter.vertical( row , dy )
+    return result
@@ -114,8 +114,8 @@ class Writer( object ):
         client = Client( self.args.service )
 
         # Format:
-        dummy_timeline = self.args.timeline or [None]
-        anim_length    = len( str( len(dummy_timeline) ) )
+        timeline       = self.args.timeline
+        frame_basename = AnimationHandler.frame_basename
 
         if not target:
             error( "[core.Writer]: Null target" )
@@ -198,7 +198,7 @@ class Writer( object ):
 
             # Flush time!
             if workstatus[id_writer]:
-                if not client.serviceRequest( animator.export , f"frame{time:0{anim_length}}.png", target ):
+                if not client.serviceRequest( animator.export , frame_basename( time , timeline ), target ):
                     error( f"[core.Writer]: Cannot export frames with <{target.name()}>" )
                     status.internalStopRequest( f"[core.Writer]: Error while trying to export the frame {time} of <{target.name()}>\n"          +
                                                  "             : Maybe this layer doesn't have permissions to write in the target directory.\n" +
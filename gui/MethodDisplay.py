@@ -30,7 +30,8 @@ from PyQt5.QtWidgets import ( QTreeView , QAbstractItemView , QStyledItemDelegat
                               QSpinBox , QComboBox )
 from PyQt5.QtCore    import pyqtSlot , pyqtSignal , QTimer
 
-INDEX_METHODS = ["force","any-neighbor","corners","not-corners","strict-horizontal","strict-vertical"]
+INDEX_METHODS = ["force","any-neighbor","corners","not-corners","strict-horizontal","strict-vertical",
+                 "square","octagon","disc"]
 
 class PComboBox( QComboBox ):
     """
@@ -50,7 +51,7 @@ class MethodDelegate( QStyledItemDelegate ):
         Delegate that creates an editor for the data retrieved by
         MethodModel.
     """
-    MAX      = 200
+    MAX      = 1000
     MIN      = 1
     NAME_COL = 0
     STEP_COL = 1
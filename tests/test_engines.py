@@ -0,0 +1,181 @@
+# Module:   tests.test_engines.py | [ Language Python ]
+# Author:   Gaps | sGaps | ArtGaps
+# LICENSE:  GPLv3 (available in ./LICENSE.txt)
+# -------------------------------------------------
+"""
+    Randomized equivalence test of the Grow engines. Every engine, region
+    wrapper and compiled recipe must give the same bytes as the baseline:
+    AlphaGrow.Grow applying the raw recipe one step at a time.
+
+    It doesn't need Krita nor PyQt5, so it runs from the root of the plugin with:
+        python -m unittest discover -s tests
+
+    [:] Defined in this module
+    --------------------------
+    EngineEquivalence   :: class
+        Compares the engines on random frames and recipes.
+
+    TRIALS              :: int
+        Number of random frames and recipes checked by each test.
+
+    [*] Author
+     |- Gaps : sGaps : ArtGaps
+"""
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert( 0 , os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+from core.AlphaGrow        import Grow
+from core.Engines          import ENGINES , BatchGrow
+from core.AlphaGrowRegions import TileGrow , BandGrow , ComponentGrow , PatchGrow
+from core.Recipe           import compileRecipe , runPlan , SHAPE_METHODS
+
+TRIALS  = 300
+METHODS = [ Grow.force_grow , Grow.any_neighbor_grow , Grow.corners_grow , Grow.not_corners_grow ,
+            Grow.strict_horizontal_grow , Grow.strict_vertical_grow ,
+            Grow.square_grow , Grow.octagon_grow , Grow.disc_grow ]
+
+def randomFrame( rand , width , height ):
+    """ RETURNS
+            bytearray. Alpha data with random blobs (sometimes empty or full). Like the
+            data made by AlphaScrapper.Scrapper, its pixels are 0x00 or 0xFF. """
+    size = width * height
+    kind = rand.random()
+    if kind < 0.05: return bytearray( size )
+    if kind < 0.10: return bytearray( b"\xff" * size )
+    alpha   = bytearray( size )
+    density = rand.random() * 0.3
+    for _ in range( max( 1 , int( size * density / 9 ) ) ):
+        x , y = rand.randrange( width ) , rand.randrange( height )
+        for dy in range( -1 , 2 ):
+            for dx in range( -1 , 2 ):
+                if 0 <= x + dx < width and 0 <= y + dy < height and rand.random() < 0.7:
+                    alpha[ (y + dy) * width + x + dx ] = 0xFF
+    return alpha
+
+def randomRecipe( rand ):
+    """ RETURNS
+            [(Grow.method,int)]. Random raw recipe, with repeated methods so they're fused. """
+    recipe = []
+    for _ in range( rand.randint( 1 , 5 ) ):
+        task = rand.choice( METHODS )
+        if recipe and rand.random() < 0.3:
+            task = recipe[-1][0]
+        recipe.append( ( task , rand.randint( 0 , 5 ) ) )
+    return recipe
+
+def randomPolicy( rand ):
+    """ RETURNS
+            function($Grow-State) -> bool. Custom policy that only depends on the neighbors. """
+    accepted = [ rand.random() < 0.5 for _ in range( 16 ) ]
+    return lambda state: accepted[ (state >> 4) & 0x0F ]
+
+def runRaw( grow , recipe ):
+    """ Applies a raw recipe one step at a time. The steps of the shaped methods are their radius. """
+    for task , steps in recipe:
+        if task.__name__ in SHAPE_METHODS:
+            if steps > 0: task( grow , steps )
+        else:
+            for _ in range( steps ):
+                task( grow )
+    return grow
+
+def result( grow , alpha ):
+    """ RETURNS
+            ( bytes , bytes , bytes ). Outputs of a grown engine. """
+    return ( bytes( grow.difference_with( alpha ) ) , bytes( grow.unlift_data() ) , bytes( grow.xor_with( alpha ) ) )
+
+class EngineEquivalence( unittest.TestCase ):
+    """ Every engine must give the same result as Grow with the raw recipe. """
+
+    def cases( self , seed ):
+        """ YIELDS
+                ( int , bytearray , int , int , recipe , plan , policy ). Random cases. """
+        rand = random.Random( seed )
+        for trial in range( TRIALS ):
+            width , height = rand.randint( 1 , 40 ) , rand.randint( 1 , 40 )
+            recipe = randomRecipe( rand )
+            policy = randomPolicy( rand ) if rand.random() < 0.3 else None
+            yield ( trial , randomFrame( rand , width , height ) , width , height ,
+                    recipe , compileRecipe( recipe ) , policy )
+
+    @staticmethod
+    def baseline( alpha , width , height , recipe , policy ):
+        """ RETURNS
+                ( bytes , bytes , bytes ). Result of Grow with the raw recipe. """
+        grow = Grow.singleton()
+        grow.setData( alpha , width , width * height )
+        runRaw( grow , recipe )
+        if policy: grow.grow_with_custom_policy( policy )
+        return result( grow , alpha )
+
+    def check( self , grow , alpha , width , height , plan , policy , expected , message ):
+        """ Grows a frame with a compiled plan and compares it with the expected result. """
+        grow.setData( alpha , width , width * height )
+        runPlan( grow , plan )
+        if policy: grow.grow_with_custom_policy( policy )
+        self.assertEqual( result( grow , alpha ) , expected , message )
+
+    def test_compiled_recipe( self ):
+        for trial , alpha , width , height , recipe , plan , policy in self.cases( 1 ):
+            expected = self.baseline( alpha , width , height , recipe , policy )
+            for translate in ( False , True ):
+                self.check( Grow.singleton( translate = translate ) , alpha , width , height , plan , policy , expected ,
+                            f"trial {trial}: Grow (translate = {translate}) {recipe}" )
+
+    def test_engines( self ):
+        for trial , alpha , width , height , recipe , plan , policy in self.cases( 2 ):
+            expected = self.baseline( alpha , width , height , recipe , policy )
+            for name , engine in ENGINES.items():
+                self.check( engine.singleton() , alpha , width , height , plan , policy , expected ,
+                            f"trial {trial}: {name} {recipe}" )
+
+    def test_regions( self ):
+        rand = random.Random( 3 )
+        for trial , alpha , width , height , recipe , plan , policy in self.cases( 3 ):
+            expected = self.baseline( alpha , width , height , recipe , policy )
+            engine   = rand.choice( list( ENGINES.values() ) )
+            regions  = ( TileGrow.singleton( engine = engine , tileSize = rand.randint( 1 , 16 ) ) ,
+                         BandGrow.singleton( engine = engine , bandHeight = rand.randint( 1 , 16 ) ) ,
+                         ComponentGrow.singleton( engine = engine ) ,
+                         PatchGrow.singleton( engine = engine ) )
+            for grow in regions:
+                self.check( grow , alpha , width , height , plan , policy , expected ,
+                            f"trial {trial}: {type(grow).__name__}({engine.__name__}) {recipe}" )
+
+    def test_patch( self ):
+        rand = random.Random( 4 )
+        for trial , alpha , width , height , recipe , plan , policy in self.cases( 4 ):
+            engine = rand.choice( list( ENGINES.values() ) )
+            grow   = PatchGrow.singleton( engine = engine )
+            frame  = alpha
+            for index in range( 4 ):
+                # Consecutive frames with a few changed pixels:
+                frame = bytearray( frame )
+                for _ in range( rand.randint( 0 , 3 ) ):
+                    frame[ rand.randrange( len( frame ) ) ] = rand.choice( ( 0x00 , 0xFF ) )
+                expected = self.baseline( frame , width , height , recipe , policy )
+                self.check( grow , frame , width , height , plan , policy , expected ,
+                            f"trial {trial}, frame {index}: PatchGrow({engine.__name__}) {recipe}" )
+
+    @unittest.skipIf( BatchGrow is None , "NumPy isn't available" )
+    def test_batch( self ):
+        rand  = random.Random( 5 )
+        batch = BatchGrow.singleton()
+        for trial , alpha , width , height , recipe , plan , policy in self.cases( 5 ):
+            frames = [ alpha ] + [ randomFrame( rand , width , height ) for _ in range( rand.randint( 0 , 4 ) ) ]
+            batch.setFrames( frames , width , height )
+            runPlan( batch , plan )
+            if policy: batch.grow_with_custom_policy( policy )
+            borders = batch.difference_with( frames )
+            grown   = batch.unlift_data()
+            for index , frame in enumerate( frames ):
+                expected = self.baseline( frame , width , height , recipe , policy )
+                self.assertEqual( ( bytes( borders[index] ) , bytes( grown[index] ) ) , expected[:2] ,
+                                  f"trial {trial}, frame {index}: BatchGrow {recipe}" )
+
+if __name__ == "__main__":
+    unittest.main()